@@ -8,6 +8,7 @@ import os
 from text_utils import normalize_text, replace_with_dictionary
 from dotenv import load_dotenv
 import text_utils
+from utils import async_fetcher
 
 load_dotenv()
 
@@ -54,24 +55,37 @@ name_corrector = NameCorrector(context)
 
 #print(characters_dict[url])
 
-def scrape_fsacg_vip_chapter(url):
+def scrape_fsacg_vip_chapter(url, part_results=None, ocr_text=None):
     global last_chapter_summary, name
     try:
-        web_scraper.download_image(img_url, "temp/vipImage"+str(count)+".png", debug=False)
-        answer = web_scraper.analyze_image("temp/vipImage"+str(count)+".png", 
-            brightness = brightness_factor,
-            contrast = contrast_factor,
-            split = True,
-            prompt="Please extract the exact Chinese text from this image using OCR (optical character recognition). Extract the text and include nothing else.",
-            debug = False)
-        with open(name+"/untranslated/v"+str(vol)+"c"+str(chap)+"("+str(count)+")_untranslated.txt", "w", encoding="utf-8") as text_file:
-            text_file.write(answer)
+        untranslated_path = name+"/untranslated/v"+str(vol)+"c"+str(chap)+"("+str(count)+")_untranslated.txt"
+        if ocr_text is not None and ocr_text.get('answer'):
+            # OCR already succeeded on an earlier attempt for this chapter; only the translation is retried
+            answer = ocr_text['answer']
+        else:
+            image_bytes = web_scraper.download_image_bytes(img_url, debug=False)
+            if image_bytes is None:
+                raise Exception("Failed to download VIP image")
+            timings = {}
+            # part_results keeps the parts that were read, so a retry only resends the failed ones
+            answer = web_scraper.analyze_image_bytes(image_bytes,
+                brightness = brightness_factor,
+                contrast = contrast_factor,
+                split = True,
+                prompt="Please extract the exact Chinese text from this image using OCR (optical character recognition). Extract the text and include nothing else.",
+                part_results = part_results,
+                timings = timings,
+                debug = False)
+            print("OCR timings:", ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+            with open(untranslated_path, "w", encoding="utf-8") as text_file:
+                text_file.write(answer)
+            if ocr_text is not None:
+                ocr_text['answer'] = answer
         
         print("Translating")
         with dspy.context(lm = dspy.LM('openai/gpt-4o-mini')):
             answer = rag(answer, last_chapter_summary)
         chapter = answer.translation
-        text_utils.clear_directory_contents("temp")
         
 
         if (trust_ocr == False):
@@ -124,6 +138,23 @@ end_chap = int(input("Chapter to end at:"))
 brightness_factor = 1.1
 contrast_factor = 2
 
+# Look up all chapter pages in range concurrently instead of one request per chapter;
+# pages that fail here are fetched again synchronously in the loop
+target_urls = []
+for v, chapters in enumerate(lis2, start=1):
+    for c, item in enumerate(chapters, start=1):
+        if (v < start_vol or (v == start_vol and c < start_chap)):
+            continue
+        if (v > end_vol or (v == end_vol and c > end_chap)):
+            break
+        target_urls.append(item['href'])
+img_urls = async_fetcher.fetch_image_urls(target_urls, img_id="vipImage", debug=False)
+public_chapters = async_fetcher.fetch_div_contents(
+    [u for u in target_urls if u in img_urls and img_urls[u] is None], div_id="ChapterBody", debug=False)
+cache_stats = web_scraper.response_cache.stats
+print(f"Page cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+      f"{cache_stats['misses']} downloaded ({web_scraper.response_cache.hit_rate():.0%} hit rate)")
+
 while(vol <= len(lis2)):
     chap = 1
     
@@ -139,11 +170,17 @@ while(vol <= len(lis2)):
 
         target_url = lis2[vol - 1][chap - 1]['href']
         print("translating volume", vol, "chapter", chap,"(", count, ")")
-        img_url = web_scraper.fetch_image_url(target_url, img_id="vipImage", debug=False)
+        if target_url in img_urls:
+            img_url = img_urls[target_url]
+        else:
+            img_url = web_scraper.fetch_image_url(target_url, img_id="vipImage", debug=False)
 
         if (img_url == None):
             print("Public chapter")
-            script = web_scraper.fetch_div_content(target_url, "ChapterBody", debug=False)
+            if target_url in public_chapters:
+                script = public_chapters[target_url]
+            else:
+                script = web_scraper.fetch_div_content(target_url, "ChapterBody", debug=False)
             print(script)
             answer = rag(script)
             
@@ -152,8 +189,11 @@ while(vol <= len(lis2)):
         else:
             print("VIP chapter")
             success = False
+            # Both only live for this chapter's attempts, so a new run always redoes the OCR
+            part_results = {}
+            ocr_text = {}
             for i in range(4):
-                result = scrape_fsacg_vip_chapter(img_url)
+                result = scrape_fsacg_vip_chapter(img_url, part_results, ocr_text)
                 if (result == 1):
                     success = True
                     break
@@ -1,7 +1,12 @@
 import utils.automated_login as automated_login
 import scrapers.helpers as helpers
 import utils.selenium_utils as selenium_utils
+from scrapers.toc_cache import TocCache
 import re
+import json
+from collections import deque
+from itertools import islice
+from bs4 import BeautifulSoup
 from dspyBot import Translator, NameCorrector
 import dspy
 from dotenv import load_dotenv
@@ -249,72 +254,290 @@ def clean_novel_text_advanced(text, debug=False):
     return cleaned_text
 
 
-def novelpia_scrape(url, name, start_chapter, end_chapter, manual_name_translation={}):
+# Viewer endpoint the chapter text is loaded from after the viewer page opens
+NOVELPIA_VIEWER_DATA_PATTERN = r"/proc/viewer_data"
+
+
+def parse_novelpia_viewer_data(body, debug=False):
+    """
+    Parse the JSON payload of novelpia's viewer data request into chapter lines.
+    
+    Args:
+        body (str): Response body of the viewer data request
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        list: Text lines in reading order, or None if the payload has no text
+    """
+    try:
+        data = json.loads(body)
+    except (TypeError, ValueError):
+        if debug:
+            print("Viewer data is not JSON")
+        return None
+    
+    items = data.get('s') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        if debug:
+            print(f"Unexpected viewer data keys: {list(data)[:10] if isinstance(data, dict) else type(data)}")
+        return None
+    
+    lines = []
+    for item in items:
+        html = item.get('text') if isinstance(item, dict) else None
+        if not html:
+            continue
+        # Items are HTML fragments; images and empty spacer lines carry no text
+        text = BeautifulSoup(html, 'html.parser').get_text('\n')
+        for line in text.split('\n'):
+            line = line.replace('\xa0', ' ').strip()
+            if line:
+                lines.append(line)
+    
+    if debug:
+        print(f"Parsed {len(lines)} lines from {len(items)} viewer data items")
+    return lines or None
+
+
+def fetch_novelpia_chapter(driver, link, capture=True, debug=False, prefetcher=None):
+    """
+    Fetch a chapter's lines, reading the viewer's data payload when possible and
+    falling back to scraping the rendered font.line elements.
+    
+    Args:
+        driver: Logged-in WebDriver
+        link (str): Viewer URL of the chapter
+        capture (bool): If True, try the network payload first
+        debug (bool): If True, prints debug information
+        prefetcher (TabPrefetcher): If the chapter was prefetched, its already rendered tab is read
+        
+    Returns:
+        list: Chapter lines, or None if the chapter is not available
+    """
+    if prefetcher is not None and link in prefetcher.tabs:
+        lines = selenium_utils.fetch_with_existing_driver_custom(
+            driver, link, element_type="font", element_class="line", debug=debug, prefetcher=prefetcher, text_only=True,
+            scroll_mode="until_stable")['content']
+        if lines:
+            return lines
+    
+    if capture:
+        captured = selenium_utils.fetch_with_network_capture(
+            driver, link, NOVELPIA_VIEWER_DATA_PATTERN, block_profile="text_only", debug=debug)
+        if captured['success']:
+            lines = parse_novelpia_viewer_data(captured['body'], debug=debug)
+            if lines:
+                return lines
+        if debug:
+            print("Viewer data not captured, falling back to the rendered page")
+    
+    return selenium_utils.fetch_with_existing_driver_custom(
+        driver, link, element_type="font", element_class="line", debug=debug, block_profile="text_only", text_only=True,
+        scroll_mode="until_stable")['content']
+
+
+def iter_novelpia_toc(driver, toc_cache, url_header="https://novelpia.com/viewer/", debug=False):
+    """
+    Yield the novel's episodes in reading order, crawling only what the cache does not know.
+    
+    With a cached TOC and list request, only the pages from the first unknown episode
+    onward are fetched; known episodes come straight from the cache. Without a cache
+    the full crawl is streamed as pages arrive.
+    
+    Args:
+        driver: WebDriver on the novel's table of contents page
+        toc_cache (TocCache): Cache for this novel
+        url_header (str): Prefix that turns an episode number into a viewer URL
+        debug (bool): If True, prints debug information
+        
+    Yields:
+        dict: TOC entries with 'episode_id', 'title', 'url' and 'content_hash'
+    """
+    def to_entries(crawl):
+        for episode in crawl:
+            yield {
+                'episode_id': episode['episode_no'],
+                'title': episode['title'],
+                'url': url_header + str(episode['episode_no'])
+            }
+    
+    def remember(discovered):
+        template = discovered.get('template')
+        if template and template.get('kind') in ('url', 'xhr'):
+            toc_cache.meta['list_request'] = template
+        if discovered.get('page_size'):
+            toc_cache.meta['page_size'] = discovered['page_size']
+        toc_cache.save()
+    
+    cached = list(toc_cache.entries)
+    
+    if not cached:
+        discovered = {}
+        for entry in toc_cache.iter_new(to_entries(selenium_utils.iter_episode_toc(driver, discovered=discovered, debug=debug))):
+            # Save the list request before handing out the first episode, so a restart
+            # in the middle of the stream can resume the crawl instead of redoing it
+            if 'page_size' not in toc_cache.meta:
+                remember(discovered)
+            yield entry
+        remember(discovered)
+        return
+    
+    # The crawl runs before any cached entry is handed out, because the caller may
+    # navigate away from the TOC page as soon as it gets an episode
+    discovered = {}
+    template = toc_cache.meta.get('list_request')
+    page_size = toc_cache.meta.get('page_size')
+    if template and page_size:
+        start_page = len(cached) // page_size + 1
+        crawl = selenium_utils.iter_episode_toc(driver, template=template, start_page=start_page,
+                                                discovered=discovered, debug=debug)
+        try:
+            new_entries = list(toc_cache.iter_new(to_entries(crawl)))
+        except RuntimeError as e:
+            # Episodes read before the failure are already recorded in the cache
+            print(f"Saved TOC request failed ({e}), re-crawling the table of contents")
+            toc_cache.meta.pop('list_request', None)
+            discovered = {}
+            crawl = selenium_utils.iter_episode_toc(driver, discovered=discovered, debug=debug)
+            list(toc_cache.iter_new(to_entries(crawl)))
+            new_entries = toc_cache.entries[len(cached):]
+    else:
+        crawl = selenium_utils.iter_episode_toc(driver, discovered=discovered, debug=debug)
+        new_entries = list(toc_cache.iter_new(to_entries(crawl)))
+    remember(discovered)
+    
+    print(f"TOC: {len(cached)} cached episodes, {len(new_entries)} new")
+    yield from cached
+    yield from new_entries
+
+
+def _with_lookahead(iterable, n):
+    """Yield (item, upcoming) pairs, where upcoming lists up to n of the following items"""
+    iterator = iter(iterable)
+    window = deque(islice(iterator, n + 1))
+    while window:
+        item = window.popleft()
+        yield item, list(window)
+        window.extend(islice(iterator, 1))
+
+
+def translate_novelpia_chapter(driver, i, episode, name, tl, last_chapter_summary, manual_name_translation, toc_cache,
+                               prefetcher=None, upcoming=()):
+    """
+    Fetch, save and translate one chapter.
+    
+    Args:
+        driver: Logged-in WebDriver
+        i (int): Chapter index in the TOC
+        episode (dict): TOC entry with 'episode_id', 'title' and 'url'
+        name (str): Novel name (output directory)
+        tl: dspy Translator
+        last_chapter_summary (str): Summary of the previous chapter
+        manual_name_translation (dict): Glossary of name translations
+        toc_cache (TocCache): Cache recording the chapter's content hash
+        prefetcher (TabPrefetcher): Background tabs for the upcoming chapters
+        upcoming (list): TOC entries of the next chapters, loaded while this one is translated
+        
+    Returns:
+        str: Summary of this chapter, for the next one
+    """
+    chapter = fetch_novelpia_chapter(driver, episode['url'], prefetcher=prefetcher)
+    if prefetcher is not None:
+        prefetcher.prefetch([entry['url'] for entry in upcoming])
+    if chapter == None:
+        print("Chapter", i, "is not available")
+        chapter = ["Chapter " + str(i) + " is not available"]
+
+    chapter_text = ""
+    for line in chapter:
+        # Filter out tokens from each line
+        filtered_line = filter_tokens_from_text(line, debug=False)
+        if filtered_line.strip():  # Only add non-empty lines
+            chapter_text += filtered_line + "\n\n"
+
+    
+    
+    #save untranslated chapter
+    with open("texts/inprogress_translations/" + name + "/untranslated/v"+str(1)+"c"+str(i)+"("+str(i)+")_"+".txt", "w", encoding="utf-8") as text_file:
+            text_file.write(chapter_text)
+    toc_cache.set_content_hash(episode['episode_id'], chapter_text)
+    toc_cache.save()
+
+    #translate chapter
+    answer = tl(chapter_text, last_chapter_summary, glossary = manual_name_translation)
+    chapter_text = helpers.replace_with_dictionary(answer.translation, manual_name_translation, confident=True)
+    #get summary to use for next chapter
+    with dspy.context(lm=dspy.LM('openai/gpt-4o-mini')):
+        last_chapter_summary = dspy.Predict('chapter, last_chapter_summary -> summary')(chapter = chapter_text, last_chapter_summary = last_chapter_summary).summary
+    
+    #save translated chapter
+    title = dspy.Predict('prompt, title -> translation')(prompt="Please translate this title to English.", title=episode['title']).translation
+    with open("texts/inprogress_translations/" + name+"/translated/v"+str(1)+"c"+str(i)+"("+str(i)+")_"+helpers.sanitize_filename(title)+".txt", "w", encoding="utf-8") as text_file:
+            text_file.write(chapter_text)
+    return last_chapter_summary
+
+
+def novelpia_scrape(url, name, start_chapter, end_chapter, manual_name_translation={}, max_retries=3, recycle_every=150,
+                    prefetch=2):
     try:
-        links = []
-        titles = []
         last_chapter_summary = ""
         url_header = "https://novelpia.com/viewer/"
+        site_url = "https://novelpia.com/"
 
 
-        login_result = automated_login.manual_login(url="https://novelpia.com/", debug=False) 
-        output = selenium_utils.fetch_with_existing_driver_div(login_result['driver'], url, div_class="page-link", debug=False)
+        login_result = automated_login.manual_login(url=site_url, debug=False) 
+        driver = login_result['driver']
 
+        # Episodes stream in as TOC pages arrive, so translation starts after the first page;
+        # on later runs only episodes published since the last crawl are fetched
+        toc_cache = TocCache(name)
 
-        page = 2
-        while True:
-            table = selenium_utils.interact_with_episode_table(login_result['driver'], debug=False)['episodes']
-            for o in table:
-                links.append(url_header + str(o['episode_no']))
-                titles.append(o['title'])
-            pagination = selenium_utils.interact_with_pagination(login_result['driver'], page_number=page, wait_time=1, debug=False)
-            if not pagination['click_success']:
-                break
-            page += 1
-
-        #print(links)
         lm = dspy.LM('openai/gpt-4o-mini', max_tokens=16000, temperature=0.8)
         dspy.configure(lm=lm)
         tl = Translator()
 
+        # Supervise the run: when the browser dies, relaunch it with the saved cookies,
+        # restore the TOC from the cache and continue from the chapter that failed
+        # Restart the browser between chapters before its memory use slows pages down
+        recycler = automated_login.DriverRecycler(site_url, every_pages=recycle_every, debug=False)
+        next_chapter = start_chapter
+        failures = 0
+        while True:
+            try:
+                output = selenium_utils.fetch_with_existing_driver_div(driver, url, div_class="page-link", debug=False, text_only=True)
+                toc = iter_novelpia_toc(driver, toc_cache, url_header)
+                recycled = False
+                # The next chapters load in background tabs while the current one is translated
+                prefetcher = selenium_utils.TabPrefetcher(driver, max_tabs=prefetch, block_profile="text_only", debug=False) if prefetch else None
 
-        for i in range(len(links)):
-            if (i < start_chapter):
-                continue
-            print("Translating chapter", i, "of", len(links))
-
-            chapter = selenium_utils.fetch_with_existing_driver_custom(login_result['driver'], links[i], element_type="font", element_class="line", debug=False)['content']
-            if chapter == None:
-                print("Chapter", i, "is not available")
-                chapter = ["Chapter " + str(i) + " is not available"]
-
-            chapter_text = ""
-            for line in chapter:
-                # Filter out tokens from each line
-                filtered_line = filter_tokens_from_text(line, debug=False)
-                if filtered_line.strip():  # Only add non-empty lines
-                    chapter_text += filtered_line + "\n\n"
-
-            
-            
-            #save untranslated chapter
-            with open("texts/inprogress_translations/" + name + "/untranslated/v"+str(1)+"c"+str(i)+"("+str(i)+")_"+".txt", "w", encoding="utf-8") as text_file:
-                    text_file.write(chapter_text)
-
-            #translate chapter
-            answer = tl(chapter_text, last_chapter_summary, glossary = manual_name_translation)
-            chapter_text = helpers.replace_with_dictionary(answer.translation, manual_name_translation, confident=True)
-            #get summary to use for next chapter
-            with dspy.context(lm=dspy.LM('openai/gpt-4o-mini')):
-                last_chapter_summary = dspy.Predict('chapter, last_chapter_summary -> summary')(chapter = chapter_text, last_chapter_summary = last_chapter_summary).summary
-            
-            #save translated chapter
-            title = dspy.Predict('prompt, title -> translation')(prompt="Please translate this title to English.", title=titles[i]).translation
-            with open("texts/inprogress_translations/" + name+"/translated/v"+str(1)+"c"+str(i)+"("+str(i)+")_"+helpers.sanitize_filename(title)+".txt", "w", encoding="utf-8") as text_file:
-                    text_file.write(chapter_text)
+                for i, (episode, upcoming) in enumerate(_with_lookahead(toc, prefetch)):
+                    if (i < next_chapter):
+                        continue
+                    print("Translating chapter", i)
+                    last_chapter_summary = translate_novelpia_chapter(
+                        driver, i, episode, name, tl, last_chapter_summary, manual_name_translation, toc_cache,
+                        prefetcher=prefetcher, upcoming=upcoming)
+                    next_chapter = i + 1
+                    failures = 0
+                    automated_login.save_driver_cookies(driver, site_url)
+                    recycler.record_page()
+                    # The TOC is tied to the old browser, so it is reopened after a recycle
+                    driver, recycled = recycler.maybe_recycle(driver)
+                    if recycled:
+                        break
+                if not recycled:
+                    break
+            except (NoSuchWindowException, SessionNotCreatedException, WebDriverException, TimeoutException) as e:
+                failures += 1
+                if failures > max_retries:
+                    print(f"❌ Chapter {next_chapter} failed {failures} times in a row, giving up.")
+                    raise
+                print(f"⚠️  Browser failed at chapter {next_chapter} ({type(e).__name__}), relaunching (attempt {failures}/{max_retries})...")
+                driver = automated_login.relaunch_driver(site_url, old_driver=driver, debug=False)['driver']
 
         cost = sum([x['cost'] for x in lm.history if x['cost'] is not None])  # in USD, as calculated by LiteLLM for certain providers
         print("Cost:", cost)
+        print("Page interaction:", selenium_utils.PAGE_INTERACTION_STATS)
     except (NoSuchWindowException, SessionNotCreatedException) as e:
         print("❌ Browser was closed or session was lost.")
         print("   The scraping process was interrupted because the browser window was closed.")
@@ -1,6 +1,7 @@
 import utils.automated_login as automated_login
 import scrapers.helpers as helpers
 import utils.selenium_utils as selenium_utils
+from scrapers.toc_cache import TocCache
 import re
 from dspyBot import Translator, NameCorrector
 import dspy
@@ -259,7 +260,7 @@ def qidian_scrape(url, name, start_chapter, end_chapter, manual_name_translation
         login_result = automated_login.manual_login(url="https://www.qidian.com/", debug=False) 
         #output = selenium_utils.fetch_with_existing_driver_div(login_result['driver'], url, div_class="page-link", debug=False)
 
-        lis = selenium_utils.fetch_with_existing_driver_list(login_result['driver'], url, list_class="volume-chapters", parent_div_class="catalog-volume", debug=False)
+        lis = selenium_utils.fetch_with_existing_driver_list(login_result['driver'], url, list_class="volume-chapters", parent_div_class="catalog-volume", debug=False, text_only=True)
         print(lis.keys())
         zero_volume = False
 
@@ -269,6 +270,24 @@ def qidian_scrape(url, name, start_chapter, end_chapter, manual_name_translation
         lis2 = lis["urls"]
         print(lis2)
 
+        # Compare the catalog with the last crawl: once a cache exists, only chapters that are
+        # new or changed since then are translated
+        toc_cache = TocCache(name)
+        catalog = []
+        for volume_urls, volume_titles in zip(lis2, lis["content"] or []):
+            for j, chapter_url in enumerate(volume_urls):
+                if chapter_url:
+                    catalog.append({
+                        'episode_id': chapter_url,
+                        'title': volume_titles[j] if j < len(volume_titles) else None,
+                        'url': chapter_url
+                    })
+        catalog_by_url = {entry['url']: entry for entry in catalog}
+        incremental = len(toc_cache) > 0
+        toc_changes = toc_cache.diff(catalog)
+        pending = {entry['url'] for entry in toc_changes['new'] + toc_changes['changed']}
+        print(f"TOC: {len(toc_changes['new'])} new and {len(toc_changes['changed'])} changed chapters since the last crawl")
+
         #print(links)
         lm = dspy.LM('openai/gpt-4o-mini', max_tokens=16000, temperature=0.8)
         dspy.configure(lm=lm)
@@ -277,18 +296,21 @@ def qidian_scrape(url, name, start_chapter, end_chapter, manual_name_translation
         while (vol <= len(lis2)):
             chap = 1
             while (chap <= len(lis2[vol if zero_volume else vol - 1])):
-                if (count < start_chapter):
+                target_url = lis2[vol if zero_volume else vol - 1][chap - 1]
+                if (count < start_chapter or (incremental and target_url not in pending)):
+                    # Unchanged chapters stay recorded; chapters before the start count as handled
+                    if target_url in catalog_by_url:
+                        toc_cache.merge([catalog_by_url[target_url]])
                     chap += 1
                     count += 1
                     continue
-                target_url = lis2[vol if zero_volume else vol - 1][chap - 1]
                 print("translating volume", vol, "chapter", chap,"(", count, ")")
                 index = target_url.find("www.qidian.com")
                 chapter_text = selenium_utils.fetch_with_existing_driver_custom(
-                    login_result['driver'], 'https://' + target_url[index:], element_type="main", element_class="content", debug=False)['content']
+                    login_result['driver'], 'https://' + target_url[index:], element_type="main", element_class="content", debug=False, block_profile="text_only", text_only=True, scroll_mode="until_stable")['content']
                 
                 title = selenium_utils.fetch_with_existing_driver_custom(
-                    login_result['driver'], 'https://' + target_url[index:], element_type="h1", element_class="title", debug=False)['content']
+                    login_result['driver'], 'https://' + target_url[index:], element_type="h1", element_class="title", debug=False, text_only=True, scroll_mode="until_stable")['content']
                 title = dspy.Predict('prompt, title -> translation')(prompt="Please translate this title.", title = title).translation
             
                 if not chapter_text:
@@ -298,7 +320,7 @@ def qidian_scrape(url, name, start_chapter, end_chapter, manual_name_translation
                         print("Attempting to fetch chapter text, attempt", i + 1)
                         try:
                             chapter_text = selenium_utils.fetch_with_existing_driver_custom(
-                                login_result['driver'], 'https://' + target_url[index:], element_type="main", element_class="content", debug=False)['content']
+                                login_result['driver'], 'https://' + target_url[index:], element_type="main", element_class="content", debug=False, block_profile="text_only", text_only=True, scroll_mode="until_stable")['content']
                             flag = True
                             break
                         except:
@@ -317,11 +339,18 @@ def qidian_scrape(url, name, start_chapter, end_chapter, manual_name_translation
 
                 with open("texts/inprogress_translations/" + name+"/translated/v"+str(vol)+"c"+str(chap)+"("+str(count)+")_"+helpers.sanitize_filename(title)+".txt", "w", encoding="utf-8") as text_file:
                         text_file.write(chapter_text)
+                # Recorded only once translated, so an interrupted run leaves the rest pending
+                if target_url in catalog_by_url:
+                    toc_cache.merge([catalog_by_url[target_url]])
+                    toc_cache.save()
                 chap += 1
                 count += 1
 
+        toc_cache.save()
+
         cost = sum([x['cost'] for x in lm.history if x['cost'] is not None])  # in USD, as calculated by LiteLLM for certain providers
         print("Cost:", cost)
+        print("Page interaction:", selenium_utils.PAGE_INTERACTION_STATS)
     except (NoSuchWindowException, SessionNotCreatedException) as e:
         print("❌ Browser was closed or session was lost.")
         print("   The scraping process was interrupted because the browser window was closed.")
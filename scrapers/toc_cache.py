@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+from typing import List, Dict, Optional
+from scrapers.helpers import sanitize_filename
+
+
+class TocCache:
+    """
+    Persisted table of contents for one novel, used to crawl only what changed
+    since the last run.
+
+    Entries are kept in reading order as dictionaries with:
+        - 'episode_id': Site-specific episode identifier (episode number or chapter URL)
+        - 'title': Episode title as listed in the TOC
+        - 'url': Episode URL
+        - 'content_hash': SHA-256 of the untranslated text, once it has been fetched
+    """
+
+    def __init__(self, name: str, cache_dir: str = "data/toc_cache"):
+        """
+        Initialize the cache for a novel and load any previous crawl.
+
+        Args:
+            name (str): Novel name, used as the cache filename
+            cache_dir (str): Directory holding the per-novel cache files
+        """
+        self.path = os.path.join(cache_dir, sanitize_filename(name) + ".json")
+        self.entries: List[Dict] = []
+        self.meta: Dict = {}
+        self._index: Dict[str, int] = {}
+        self.load()
+
+    def load(self):
+        """Load the cached TOC from file if it exists"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', [])
+            self.meta = data.get('meta', {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = []
+            self.meta = {}
+        self._index = {str(entry['episode_id']): i for i, entry in enumerate(self.entries)}
+
+    def save(self):
+        """Write the cache atomically so an interrupted run never leaves a truncated file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta, 'entries': self.entries}, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, episode_id) -> Optional[Dict]:
+        """Return the cached entry for an episode, or None if it is not known"""
+        i = self._index.get(str(episode_id))
+        return self.entries[i] if i is not None else None
+
+    def diff(self, entries: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Compare freshly crawled entries against the cache without modifying it.
+
+        Args:
+            entries (List[Dict]): Crawled entries with at least 'episode_id' and 'title'
+
+        Returns:
+            Dict[str, List[Dict]]: {'new': [...], 'changed': [...]} where changed entries
+            have a different title, URL or (if both are known) content hash
+        """
+        result = {'new': [], 'changed': []}
+        for entry in entries:
+            cached = self.get(entry['episode_id'])
+            if cached is None:
+                result['new'].append(entry)
+            elif self._is_changed(cached, entry):
+                result['changed'].append(entry)
+        return result
+
+    def merge(self, entries: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Record crawled entries in the cache and return the ones that were new or changed.
+        New entries are appended in the order given. Call save() to persist.
+        """
+        result = self.diff(entries)
+        for entry in result['new'] + result['changed']:
+            self._record(entry)
+        return result
+
+    def iter_new(self, entries, newest_first: bool = False, save_every: int = 20):
+        """
+        Record entries from a (possibly lazy) crawl and yield only unknown episodes.
+        Changed entries update the cache but are not yielded again.
+
+        Args:
+            entries: Iterable of crawled entries
+            newest_first (bool): If True, the crawl lists newest episodes first and
+                                 stops at the first already-known episode
+            save_every (int): Save the cache after this many new entries
+
+        Yields:
+            Dict: Entries that were not in the cache
+        """
+        added = 0
+        for entry in entries:
+            cached = self.get(entry['episode_id'])
+            if cached is not None:
+                if self._is_changed(cached, entry):
+                    self._record(entry)
+                elif newest_first:
+                    break
+                continue
+            self._record(entry)
+            added += 1
+            if added % save_every == 0:
+                self.save()
+            yield entry
+        self.save()
+
+    def set_content_hash(self, episode_id, text: str) -> bool:
+        """
+        Store the hash of an episode's untranslated text.
+
+        Returns:
+            bool: True if the hash differs from the one previously stored
+        """
+        entry = self.get(episode_id)
+        if entry is None:
+            return False
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        changed = entry.get('content_hash') not in (None, content_hash)
+        entry['content_hash'] = content_hash
+        return changed
+
+    def _is_changed(self, cached: Dict, entry: Dict) -> bool:
+        for key in ('title', 'url', 'content_hash'):
+            if entry.get(key) is not None and cached.get(key) is not None and entry[key] != cached[key]:
+                return True
+        return False
+
+    def _record(self, entry: Dict):
+        record = {
+            'episode_id': entry['episode_id'],
+            'title': entry.get('title'),
+            'url': entry.get('url'),
+            'content_hash': entry.get('content_hash')
+        }
+        i = self._index.get(str(entry['episode_id']))
+        if i is None:
+            self._index[str(entry['episode_id'])] = len(self.entries)
+            self.entries.append(record)
+        else:
+            # Keep a known content hash unless the crawl supplied a new one
+            if record['content_hash'] is None:
+                record['content_hash'] = self.entries[i].get('content_hash')
+            self.entries[i] = record
@@ -0,0 +1,255 @@
+"""
+Asynchronous HTTP fetching for the requests-based web_scraper functions.
+
+Many pages are fetched at once over one httpx client that shares cookies with the
+global SessionManager. Per-host concurrency limits plus the shared web_scraper
+rate controller take the place of the fixed sleeps in the synchronous functions.
+"""
+import asyncio
+import copy
+import time
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+from web_scraper import (session_manager, rate_controller as default_rate_controller, RateController, response_cache,
+                         headers as default_headers, extract_element_text, extract_image_url,
+                         response_html, parse_html, TRANSPORT_SETTINGS, _retry_after_seconds)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    print("httpx not available. Install with: pip install httpx")
+
+
+class AsyncFetcher:
+    """
+    Async HTTP client with per-host politeness limits.
+
+    Use as an async context manager. Cookies are loaded from the SessionManager on
+    entry, and cookies set by responses are written back to it on exit.
+    """
+
+    def __init__(self, max_per_host: int = 4, timeout: float = 20.0, max_retries: int = 2,
+                 request_headers: dict = None, rate_controller: RateController = None, use_cache: bool = True,
+                 debug: bool = True):
+        """
+        Args:
+            max_per_host (int): Maximum concurrent requests per host
+            timeout (float): Request timeout in seconds
+            max_retries (int): Retries for connection errors and 429/5xx responses
+            request_headers (dict): Headers to send (default: web_scraper.headers)
+            rate_controller (RateController): Request pacing (default: the shared web_scraper controller)
+            use_cache (bool): If True, serve or revalidate pages through web_scraper.response_cache
+            debug (bool): If True, prints debug information
+        """
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is not available. Install with: pip install httpx")
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.headers = dict(request_headers or default_headers)
+        self.rate_controller = rate_controller or default_rate_controller
+        self.use_cache = use_cache
+        self.debug = debug
+        self.client = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats = {'requests': 0, 'errors': 0, 'retries': 0}
+
+    async def __aenter__(self):
+        # Same transport settings as the requests sessions: over HTTP/2 the per-host
+        # requests share one multiplexed connection
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            http2=TRANSPORT_SETTINGS['http2'],
+            limits=httpx.Limits(max_connections=self.max_per_host * 4, max_keepalive_connections=self.max_per_host * 4,
+                                keepalive_expiry=TRANSPORT_SETTINGS['keepalive_expiry'])
+        )
+        # Copy the Cookie objects themselves, so each keeps its domain and path and is
+        # only sent to the hosts it belongs to
+        for cookie in session_manager.get_session().cookies:
+            self.client.cookies.jar.set_cookie(copy.copy(cookie))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._sync_cookies()
+        await self.client.aclose()
+        self.client = None
+
+    def _sync_cookies(self):
+        """Write cookies set during the run back to the shared session"""
+        jar = session_manager.get_session().cookies
+        known = {(cookie.domain, cookie.path, cookie.name): cookie.value for cookie in jar}
+        changed = False
+        for cookie in self.client.cookies.jar:
+            if known.get((cookie.domain, cookie.path, cookie.name)) != cookie.value:
+                jar.set_cookie(copy.copy(cookie))
+                changed = True
+        if changed:
+            session_manager.save_cookies()
+
+    async def _wait_turn(self, url: str):
+        """Wait for the slot the rate controller reserves for this request"""
+        delay = self.rate_controller.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _replay(self, url: str, entry: dict) -> "httpx.Response":
+        response = httpx.Response(entry['status_code'], headers=entry['headers'], content=entry['body'],
+                                  request=httpx.Request('GET', url))
+        if entry.get('encoding'):
+            response.encoding = entry['encoding']
+        return response
+
+    async def get(self, url: str) -> "httpx.Response":
+        """
+        GET a URL through the response cache, within the host's concurrency limit and
+        the rate controller's pacing.
+
+        Args:
+            url (str): URL to fetch
+
+        Returns:
+            httpx.Response: The final response (may still be an error status)
+        """
+        if not self.use_cache:
+            return await self._get(url)
+        cookies = self.client.cookies.jar
+        entry = response_cache.lookup(url, cookies)
+        if entry is not None and response_cache.is_fresh(entry):
+            response_cache.stats['hits'] += 1
+            return self._replay(url, entry)
+        response = await self._get(url, response_cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            response_cache.stats['revalidated'] += 1
+            response_cache.touch(entry, response.headers)
+            return self._replay(url, entry)
+        response_cache.stats['misses'] += 1
+        response_cache.store(url, cookies, response.status_code, response.headers, response.content, response.encoding,
+                             challenge=response.waf_challenge)
+        return response
+
+    async def _get(self, url: str, conditional_headers: dict = None) -> "httpx.Response":
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._wait_turn(url)
+                self.stats['requests'] += 1
+                request_start = time.time()
+                try:
+                    response = await self.client.get(url, headers=conditional_headers)
+                except httpx.TransportError as e:
+                    self.rate_controller.record(url, error=True)
+                    self.stats['errors'] += 1
+                    if attempt == self.max_retries:
+                        raise
+                    if self.debug:
+                        print(f"⚠️  {url}: {type(e).__name__}, retrying...")
+                else:
+                    # Classify before recording, so a challenge page counts once, as throttled
+                    # (202s are throttled by status)
+                    response.waf_challenge = (response.status_code != 202 and
+                                              response_cache.is_challenge(response.headers, response.content))
+                    self.rate_controller.record(url, response.status_code, time.time() - request_start,
+                                                throttled=True if response.waf_challenge else None,
+                                                retry_after=_retry_after_seconds(response))
+                    if response.waf_challenge or (response.status_code != 429 and response.status_code < 500):
+                        return response
+                    if attempt == self.max_retries:
+                        return response
+                    if self.debug:
+                        print(f"⚠️  {url}: HTTP {response.status_code}, retrying...")
+                self.stats['retries'] += 1
+
+    async def get_soup(self, url: str, tag=None, element_id: str = None,
+                       element_class: str = None) -> Optional[BeautifulSoup]:
+        """
+        Fetch a page and parse the targeted elements (the whole page if none are given).
+
+        Returns:
+            Optional[BeautifulSoup]: Parsed page, or None for WAF/captcha responses, which
+            need the synchronous retry logic in web_scraper
+        """
+        response = await self.get(url)
+        response.raise_for_status()
+        if response.status_code == 202 or getattr(response, 'waf_challenge', False):
+            if self.debug:
+                print(f"⚠️  {url}: challenge response (HTTP {response.status_code})")
+            return None
+        return parse_html(response_html(response), tag, element_id, element_class)
+
+    async def fetch_image_url(self, url: str, img_id: str) -> Optional[str]:
+        """Async counterpart of web_scraper.fetch_image_url"""
+        soup = await self.get_soup(url, element_id=img_id)
+        if soup is None:
+            raise RuntimeError(f"Challenge response for {url}")
+        return extract_image_url(soup, url, img_id)
+
+    async def fetch_element_content(self, url: str, tag: str = 'div', element_id: str = None,
+                                    element_class: str = None) -> Optional[Union[str, List[str]]]:
+        """Async counterpart of web_scraper.fetch_div_content / fetch_main_content"""
+        soup = await self.get_soup(url, tag, element_id, element_class)
+        if soup is None:
+            raise RuntimeError(f"Challenge response for {url}")
+        return extract_element_text(soup, tag, element_id, element_class)
+
+
+async def _fetch_all(urls: List[str], fetch, debug: bool, **fetcher_kwargs) -> Dict[str, object]:
+    results = {}
+    async with AsyncFetcher(debug=debug, **fetcher_kwargs) as fetcher:
+        outcomes = await asyncio.gather(*(fetch(fetcher, url) for url in urls), return_exceptions=True)
+    for url, outcome in zip(urls, outcomes):
+        if isinstance(outcome, Exception):
+            if debug:
+                print(f"❌ {url}: {outcome}")
+            continue
+        results[url] = outcome
+    if debug:
+        print(f"✅ Fetched {len(results)}/{len(urls)} pages concurrently")
+        print(f"💾 Response cache: {response_cache.stats} (hit rate {response_cache.hit_rate():.0%})")
+        for host, state in default_rate_controller.snapshot().items():
+            print(f"⏱️  {host}: {state['rate']:.2f} req/s (ok {state['ok']}, throttled {state['throttled']}, errors {state['errors']})")
+    return results
+
+
+def fetch_image_urls(urls: List[str], img_id: str, debug: bool = True, **fetcher_kwargs) -> Dict[str, Optional[str]]:
+    """
+    Look up the image URL of many pages concurrently.
+
+    Args:
+        urls (List[str]): Page URLs
+        img_id (str): ID of the element containing the image
+        debug (bool): If True, prints debug information
+        **fetcher_kwargs: AsyncFetcher options (max_per_host, timeout, ...)
+
+    Returns:
+        Dict[str, Optional[str]]: Page URL -> image URL (None if the page has no image).
+        Pages that failed are left out so the caller can retry them synchronously.
+    """
+    return asyncio.run(_fetch_all(urls, lambda fetcher, url: fetcher.fetch_image_url(url, img_id), debug, **fetcher_kwargs))
+
+
+def fetch_div_contents(urls: List[str], div_id: str = None, div_class: str = None, debug: bool = True,
+                       **fetcher_kwargs) -> Dict[str, Optional[Union[str, List[str]]]]:
+    """
+    Fetch the div content of many pages concurrently.
+
+    Args:
+        urls (List[str]): Page URLs
+        div_id (str, optional): ID of the div to extract
+        div_class (str, optional): Class of the divs to extract
+        debug (bool): If True, prints debug information
+        **fetcher_kwargs: AsyncFetcher options (max_per_host, timeout, ...)
+
+    Returns:
+        Dict[str, Optional[Union[str, List[str]]]]: Page URL -> content, like fetch_div_content.
+        Pages that failed are left out so the caller can retry them synchronously.
+    """
+    if div_id is None and div_class is None:
+        raise ValueError("Either div_id or div_class must be provided")
+    return asyncio.run(_fetch_all(
+        urls, lambda fetcher, url: fetcher.fetch_element_content(url, 'div', div_id, div_class), debug, **fetcher_kwargs))
@@ -8,6 +8,7 @@ import os
 import json
 import time
 from datetime import datetime
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -16,25 +17,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 import undetected_chromedriver as uc
 from web_scraper import CONFIRMED_HEADERS
-from utils.selenium_utils import create_chrome_driver_with_auto_version
+from utils.selenium_utils import create_chrome_driver_with_auto_version, start_log_drainer, get_memory_metrics
 
-def manual_login(url="https://novelpia.com/", wait_time=60, debug=True):
-    """Open browser and wait for manual login - most reliable approach."""
-    
-    def handle_alerts(driver, context=""):
-        """Helper function to handle any open alerts."""
-        try:
-            alert = driver.switch_to.alert
-            alert_text = alert.text
-            if debug:
-                print(f"⚠️  Alert detected {context}: {alert_text}")
-                print("   Please handle the alert manually in the browser")
-            # Don't dismiss - let user handle manually
-            driver.switch_to.default_content()
-            return True
-        except:
-            return False
-    
+def build_chrome_options():
+    """Chrome options shared by every driver we launch (login and relaunch)."""
     options = uc.ChromeOptions()
     # Non-headless mode for manual interaction
     # options.add_argument("--headless")
@@ -51,14 +37,254 @@ def manual_login(url="https://novelpia.com/", wait_time=60, debug=True):
         'performance': 'ALL',
         'browser': 'ALL'
     })
+    return options
+
+
+# Cookies that are only set for a logged-in user, per site
+LOGIN_COOKIES = {
+    'novelpia.com': ('LOGINKEY',),
+    'qidian.com': ('ywguid', 'ywkey'),
+}
+
+
+def default_profile_dir(url):
+    """Persistent Chrome profile directory for a site, e.g. profiles/novelpia.com"""
+    host = urlparse(url).netloc or url
+    if host.startswith("www."):
+        host = host[4:]
+    return os.path.join("profiles", host.replace(':', '_'))
+
+
+def is_logged_in(driver, url, debug=False):
+    """
+    Fast login-state probe: checks the browser for the site's login cookies.
+    
+    Args:
+        driver: WebDriver with the site open
+        url (str): Site URL, used to pick the login cookies to look for
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        bool: True if a login cookie is present; always False for sites without an entry in LOGIN_COOKIES
+    """
+    host = urlparse(url).netloc
+    names = next((cookies for site, cookies in LOGIN_COOKIES.items() if host.endswith(site)), None)
+    if not names:
+        return False
+    try:
+        present = {cookie['name'] for cookie in driver.get_cookies() if cookie.get('value')}
+    except Exception:
+        return False
+    logged_in = any(name in present for name in names)
+    if debug:
+        print(f"{'✅' if logged_in else '❌'} Login probe for {host}: {'logged in' if logged_in else 'not logged in'}")
+    return logged_in
+
+
+def _driver_cookies_path(url):
+    """Per-host file holding the last saved browser cookies."""
+    host = urlparse(url).netloc or url
+    return os.path.join("data", "driver_cookies", host.replace(':', '_') + ".json")
+
+
+def save_driver_cookies(driver, url, debug=False):
+    """
+    Save the driver's cookies for the site so a relaunched browser can restore the session.
+    
+    Args:
+        driver: Logged-in WebDriver
+        url (str): Any URL on the site, used to name the cookie file
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        bool: True if the cookies were saved
+    """
+    path = _driver_cookies_path(url)
+    try:
+        cookies = driver.get_cookies()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f, indent=2)
+        os.replace(tmp_path, path)
+        if debug:
+            print(f"💾 Saved {len(cookies)} browser cookies to {path}")
+        return True
+    except Exception as e:
+        if debug:
+            print(f"⚠️  Could not save browser cookies: {e}")
+        return False
+
+
+def relaunch_driver(url="https://novelpia.com/", old_driver=None, debug=True, profile_dir=None):
+    """
+    Start a fresh browser after a crash and restore the session from the last saved cookies,
+    without waiting for a manual login.
+    
+    Args:
+        url (str): Site URL the cookies were saved for
+        old_driver: Crashed driver to clean up, if any
+        debug (bool): If True, prints debug information
+        profile_dir (str): Persistent Chrome profile to reopen (default: the site's profile under profiles/)
+        
+    Returns:
+        dict: {'driver': WebDriver, 'cookies_restored': int}
+    """
+    if old_driver is not None:
+        drainer = getattr(old_driver, '_log_drainer', None)
+        if drainer is not None:
+            drainer.stop()
+        try:
+            old_driver.quit()
+        except Exception:
+            pass
+    
+    driver = create_chrome_driver_with_auto_version(options=build_chrome_options(), debug=debug,
+                                                    user_data_dir=profile_dir or default_profile_dir(url))
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Performance.enable', {})
+    start_log_drainer(driver, debug=debug)
+    
+    # Cookies can only be added for the domain currently open
+    driver.get(url)
+    restored = 0
+    try:
+        with open(_driver_cookies_path(url), 'r', encoding='utf-8') as f:
+            cookies = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cookies = []
+        if debug:
+            print("⚠️  No saved browser cookies - the relaunched browser is not logged in")
+    for cookie in cookies:
+        # Chrome rejects the expiry of session cookies restored as floats
+        if 'expiry' in cookie:
+            cookie['expiry'] = int(cookie['expiry'])
+        try:
+            driver.add_cookie(cookie)
+            restored += 1
+        except Exception as e:
+            if debug:
+                print(f"⚠️  Could not restore cookie {cookie.get('name')}: {e}")
+    driver.refresh()
+    
+    if debug:
+        print(f"✅ Browser relaunched with {restored}/{len(cookies)} cookies restored")
+    return {'driver': driver, 'cookies_restored': restored}
+
+
+class DriverRecycler:
+    """
+    Restarts the browser periodically to cap Chrome's memory growth over long runs.
+    
+    The driver is recycled after every_pages pages, or earlier once the JS heap or DOM
+    node count passes its threshold. Call maybe_recycle between chapters; the
+    session carries over through the saved cookies and the site profile.
+    """
+    
+    def __init__(self, url, every_pages=150, max_js_heap_mb=512, max_nodes=None, debug=True):
+        """
+        Args:
+            url (str): Site URL used to save and restore cookies
+            every_pages (int): Recycle after this many pages (None to disable)
+            max_js_heap_mb (float): Recycle when the used JS heap exceeds this (None to disable)
+            max_nodes (int): Recycle when the DOM node count exceeds this (None to disable)
+            debug (bool): If True, prints debug information
+        """
+        self.url = url
+        self.every_pages = every_pages
+        self.max_js_heap_mb = max_js_heap_mb
+        self.max_nodes = max_nodes
+        self.debug = debug
+        self.pages = 0
+        self.stats = {'recycles': 0, 'last_reason': None, 'last_metrics': {}}
+    
+    def record_page(self, count=1):
+        """Count pages loaded by the current driver"""
+        self.pages += count
+    
+    def reason(self, driver):
+        """
+        Returns:
+            str: Why the driver should be recycled now, or None
+        """
+        if self.every_pages and self.pages >= self.every_pages:
+            return f"{self.pages} pages loaded"
+        if self.max_js_heap_mb is None and self.max_nodes is None:
+            return None
+        metrics = get_memory_metrics(driver)
+        self.stats['last_metrics'] = metrics
+        if self.max_js_heap_mb is not None and metrics.get('js_heap_used_mb', 0) > self.max_js_heap_mb:
+            return f"JS heap at {metrics['js_heap_used_mb']} MB"
+        if self.max_nodes is not None and metrics.get('nodes', 0) > self.max_nodes:
+            return f"{metrics['nodes']} DOM nodes"
+        return None
+    
+    def maybe_recycle(self, driver):
+        """
+        Recycle the driver if the policy says so.
+        
+        Returns:
+            tuple: (driver, recycled) - the driver to keep using and whether it is a new one
+        """
+        reason = self.reason(driver)
+        if reason is None:
+            return driver, False
+        if self.debug:
+            print(f"♻️  Recycling browser: {reason}")
+        save_driver_cookies(driver, self.url, debug=self.debug)
+        driver = relaunch_driver(self.url, old_driver=driver, debug=self.debug)['driver']
+        self.pages = 0
+        self.stats['recycles'] += 1
+        self.stats['last_reason'] = reason
+        return driver, True
+
+
+def manual_login(url="https://novelpia.com/", wait_time=60, debug=True, profile_dir=None, use_profile=True):
+    """
+    Open browser and wait for manual login - most reliable approach.
+    
+    The browser uses a persistent profile per site, so once logged in, later runs pass
+    the login probe and skip the manual wait entirely.
     
-    driver = create_chrome_driver_with_auto_version(options=options, debug=debug)
+    Args:
+        url (str): Site to log in to
+        wait_time (int): Seconds to wait for the manual login
+        debug (bool): If True, prints debug information
+        profile_dir (str): Chrome profile directory (default: profiles/<site>)
+        use_profile (bool): If False, use a temporary profile and always wait for login
+    """
+    
+    def handle_alerts(driver, context=""):
+        """Helper function to handle any open alerts."""
+        try:
+            alert = driver.switch_to.alert
+            alert_text = alert.text
+            if debug:
+                print(f"⚠️  Alert detected {context}: {alert_text}")
+                print("   Please handle the alert manually in the browser")
+            # Don't dismiss - let user handle manually
+            driver.switch_to.default_content()
+            return True
+        except:
+            return False
+    
+    options = build_chrome_options()
+    
+    if use_profile:
+        profile_dir = profile_dir or default_profile_dir(url)
+    else:
+        profile_dir = None
+    
+    driver = create_chrome_driver_with_auto_version(options=options, debug=debug, user_data_dir=profile_dir)
     
     try:
         # Enable network monitoring via CDP
         driver.execute_cdp_cmd('Network.enable', {})
         driver.execute_cdp_cmd('Performance.enable', {})
         
+        # Keep chromedriver's log buffers from growing over long scrapes
+        start_log_drainer(driver, debug=debug)
+        
         if debug:
             print("🔐 MANUAL LOGIN PROCESS")
             print("=" * 60)
@@ -97,9 +323,12 @@ def manual_login(url="https://novelpia.com/", wait_time=60, debug=True):
             print("   - Complete Google OAuth login")
             print("   - Wait for redirect back to novelpia.com")
         
-        # STEP 3: Wait for manual login
+        # STEP 3: Wait for manual login, unless the saved profile is still logged in
         start_time = time.time()
         logging_in = False
+        if is_logged_in(driver, url, debug=debug):
+            print("Already logged in from saved profile")
+            wait_time = 0
         while time.time() - start_time < wait_time:
             remaining_time = wait_time - (time.time() - start_time)
             
@@ -130,12 +359,18 @@ def manual_login(url="https://novelpia.com/", wait_time=60, debug=True):
                 # Handle alerts that might prevent URL access
                 handle_alerts(driver, "while checking login status")
             
+            if is_logged_in(driver, url):
+                if debug:
+                    print("✅ Login cookie detected - login successful!")
+                break
+            
             # Handle any alerts that appear during wait
             handle_alerts(driver, "during wait")
             
             time.sleep(1)
         
         print("Login successful")
+        save_driver_cookies(driver, url, debug=debug)
         
         # TODO: add check for successful login
         return {
@@ -4,35 +4,11 @@ ChromeDriver Version Fix Utility
 Helps diagnose and fix ChromeDriver version compatibility issues
 """
 
-import sys
-import subprocess
-import os
-from pathlib import Path
+from utils.selenium_utils import resolve_chrome_driver
 
 def get_chrome_version():
-    """Get the current Chrome browser version."""
-    try:
-        if sys.platform == "win32":
-            # Windows
-            result = subprocess.run(
-                ['reg', 'query', 'HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon', '/v', 'version'],
-                capture_output=True, text=True, shell=True
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if 'version' in line.lower():
-                        version = line.split()[-1]
-                        return version
-        else:
-            # Linux/Mac
-            result = subprocess.run(['google-chrome', '--version'], capture_output=True, text=True)
-            if result.returncode == 0:
-                version = result.stdout.strip().split()[-1]
-                return version
-    except Exception as e:
-        print(f"Warning: Could not detect Chrome version: {e}")
-    
-    return None
+    """Get the current Chrome browser version, through the cached driver resolution."""
+    return resolve_chrome_driver(debug=True)['version']
 
 def test_chromedriver_installation():
     """Test if ChromeDriver is properly installed and working."""
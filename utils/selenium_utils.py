@@ -1,11 +1,15 @@
 """
 All Selenium-related scraping utilities, refactored from web_scraper.py
 """
+import os
 import time
 import json
 import random
+import shutil
 import subprocess
 import sys
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from typing import List, Optional, Union
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
@@ -34,10 +38,13 @@ except ImportError:
     UNDETECTED_AVAILABLE = False
     print("Undetected ChromeDriver not available. Install with: pip install undetected-chromedriver")
 
-def get_chrome_version():
+def get_chrome_version(chrome_binary: str = None):
     """
     Get the current Chrome browser version.
     
+    Args:
+        chrome_binary (str): Chrome executable to query on Linux/Mac (default: google-chrome)
+    
     Returns:
         str: Chrome version (e.g., "138.0.7204.184")
     """
@@ -56,7 +63,7 @@ def get_chrome_version():
                         return version
         else:
             # Linux/Mac
-            result = subprocess.run(['google-chrome', '--version'], capture_output=True, text=True)
+            result = subprocess.run([chrome_binary or 'google-chrome', '--version'], capture_output=True, text=True)
             if result.returncode == 0:
                 # Extract version from output like "Google Chrome 138.0.7204.184"
                 version = result.stdout.strip().split()[-1]
@@ -66,13 +73,139 @@ def get_chrome_version():
     
     return None
 
-def create_chrome_driver_with_auto_version(options=None, debug=True):
+# Resolved Chrome versions and patched chromedriver binaries, keyed by Chrome binary path
+DRIVER_CACHE_PATH = os.path.join("data", "driver_cache.json")
+PATCHED_DRIVER_DIR = os.path.join("data", "chromedriver")
+
+# Startup timings of the drivers created in this process
+DRIVER_STARTUP_STATS = {'launches': 0, 'cache_hits': 0, 'total_seconds': 0.0, 'last_seconds': None}
+
+_driver_cache = None
+
+def find_chrome_binary():
+    """
+    Locate the Chrome browser executable.
+    
+    Returns:
+        str: Path to the Chrome executable, or None if it could not be found
+    """
+    if UNDETECTED_AVAILABLE:
+        try:
+            path = uc.find_chrome_executable()
+            if path:
+                return path
+        except Exception:
+            pass
+    for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+def _load_driver_cache() -> dict:
+    global _driver_cache
+    if _driver_cache is None:
+        try:
+            with open(DRIVER_CACHE_PATH, 'r', encoding='utf-8') as f:
+                _driver_cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _driver_cache = {}
+    return _driver_cache
+
+def _save_driver_cache():
+    os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+    tmp_path = DRIVER_CACHE_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_load_driver_cache(), f, indent=4)
+    os.replace(tmp_path, DRIVER_CACHE_PATH)
+
+def resolve_chrome_driver(debug: bool = True) -> dict:
+    """
+    Resolve the Chrome version and a previously patched chromedriver, using the cache
+    while the Chrome binary is unchanged (same path and mtime).
+    
+    Args:
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        dict: Dictionary containing:
+            - 'binary': Chrome executable path (or None)
+            - 'version': Chrome version string (or None)
+            - 'driver_executable_path': Reusable patched chromedriver (or None)
+            - 'cached': True if the version came from the cache
+    """
+    binary = find_chrome_binary()
+    mtime = None
+    if binary:
+        try:
+            mtime = os.path.getmtime(binary)
+        except OSError:
+            binary = None
+    
+    cache = _load_driver_cache()
+    entry = cache.get(binary) if binary else None
+    if entry and entry.get('mtime') == mtime and entry.get('version'):
+        driver_path = entry.get('driver_executable_path')
+        if driver_path and not os.path.exists(driver_path):
+            driver_path = None
+        if debug:
+            print(f"🔍 Chrome {entry['version']} resolved from cache ({binary})")
+        return {'binary': binary, 'version': entry['version'], 'driver_executable_path': driver_path, 'cached': True}
+    
+    # Chrome is new or was updated: detect the version again and forget the old driver
+    version = get_chrome_version(binary)
+    if binary and version:
+        cache[binary] = {'mtime': mtime, 'version': version, 'driver_executable_path': None}
+        _save_driver_cache()
+    return {'binary': binary, 'version': version, 'driver_executable_path': None, 'cached': False}
+
+def _remember_patched_driver(driver, resolution: dict, debug: bool = True):
+    """Keep a copy of the driver's patched chromedriver so later launches skip download and patching"""
+    binary = resolution['binary']
+    if not binary or resolution['driver_executable_path']:
+        return
+    try:
+        patched_path = driver.patcher.executable_path
+        stable_dir = os.path.join(PATCHED_DRIVER_DIR, resolution['version'] or 'unknown')
+        os.makedirs(stable_dir, exist_ok=True)
+        stable_path = os.path.abspath(os.path.join(stable_dir, os.path.basename(patched_path)))
+        if os.path.abspath(patched_path) != stable_path:
+            shutil.copy2(patched_path, stable_path)
+        entry = _load_driver_cache().setdefault(binary, {'mtime': os.path.getmtime(binary), 'version': resolution['version']})
+        entry['driver_executable_path'] = stable_path
+        _save_driver_cache()
+        if debug:
+            print(f"💾 Patched chromedriver cached at {stable_path}")
+    except Exception as e:
+        if debug:
+            print(f"⚠️  Could not cache patched chromedriver: {e}")
+
+def _record_driver_startup(driver, resolution: dict, start_time: float, debug: bool = True):
+    """Record how long the driver took to start and cache its patched binary"""
+    seconds = time.time() - start_time
+    DRIVER_STARTUP_STATS['launches'] += 1
+    DRIVER_STARTUP_STATS['cache_hits'] += int(bool(resolution['driver_executable_path']))
+    DRIVER_STARTUP_STATS['total_seconds'] += seconds
+    DRIVER_STARTUP_STATS['last_seconds'] = round(seconds, 3)
+    driver._startup_seconds = seconds
+    _remember_patched_driver(driver, resolution, debug)
+    if debug:
+        source = "cached driver" if resolution['driver_executable_path'] else "fresh driver"
+        print(f"⏱️  Chrome started in {seconds:.2f}s ({source})")
+    return driver
+
+def create_chrome_driver_with_auto_version(options=None, debug=True, user_data_dir=None):
     """
     Create a Chrome driver with automatic version compatibility.
     
+    The Chrome version and the patched chromedriver are cached per Chrome binary, so
+    only the first launch after a browser update detects the version and patches a driver.
+    
     Args:
         options: Chrome options
         debug (bool): If True, prints debug information
+        user_data_dir (str): Persistent Chrome profile directory. Cookies and logins
+                             survive between runs; None uses a temporary profile.
         
     Returns:
         Chrome driver instance
@@ -83,8 +216,19 @@ def create_chrome_driver_with_auto_version(options=None, debug=True):
     if debug:
         print("🔍 Setting up Chrome driver with automatic version compatibility...")
     
+    start_time = time.time()
+    
+    profile_kwargs = {}
+    if user_data_dir:
+        user_data_dir = os.path.abspath(user_data_dir)
+        os.makedirs(user_data_dir, exist_ok=True)
+        profile_kwargs['user_data_dir'] = user_data_dir
+        if debug:
+            print(f"🔍 Using persistent Chrome profile: {user_data_dir}")
+    
     # Get Chrome version
-    chrome_version = get_chrome_version()
+    resolution = resolve_chrome_driver(debug)
+    chrome_version = resolution['version']
     if chrome_version and debug:
         print(f"🔍 Detected Chrome version: {chrome_version}")
     
@@ -96,23 +240,28 @@ def create_chrome_driver_with_auto_version(options=None, debug=True):
             if debug:
                 print(f"🔍 Using ChromeDriver for major version: {major_version}")
             
-            driver = uc.Chrome(options=options, version_main=int(major_version))
+            driver_kwargs = dict(profile_kwargs)
+            if resolution['driver_executable_path']:
+                driver_kwargs['driver_executable_path'] = resolution['driver_executable_path']
+            driver = uc.Chrome(options=options, version_main=int(major_version), **driver_kwargs)
             if debug:
                 print("✅ ChromeDriver created successfully with version specification")
-            return driver
+            return _record_driver_startup(driver, resolution, start_time, debug)
     except Exception as e:
         if debug:
             print(f"⚠️  Failed to create driver with version specification: {e}")
+        # Don't reuse a cached driver that failed to start
+        resolution['driver_executable_path'] = None
     
     try:
         # Method 2: Try without version specification (let undetected-chromedriver handle it)
         if debug:
             print("🔍 Trying ChromeDriver without version specification...")
         
-        driver = uc.Chrome(options=options)
+        driver = uc.Chrome(options=options, **profile_kwargs)
         if debug:
             print("✅ ChromeDriver created successfully without version specification")
-        return driver
+        return _record_driver_startup(driver, resolution, start_time, debug)
     except Exception as e:
         if debug:
             print(f"⚠️  Failed to create driver without version specification: {e}")
@@ -122,10 +271,10 @@ def create_chrome_driver_with_auto_version(options=None, debug=True):
         if debug:
             print("🔍 Trying ChromeDriver with subprocess mode...")
         
-        driver = uc.Chrome(options=options, use_subprocess=True)
+        driver = uc.Chrome(options=options, use_subprocess=True, **profile_kwargs)
         if debug:
             print("✅ ChromeDriver created successfully with subprocess mode")
-        return driver
+        return _record_driver_startup(driver, resolution, start_time, debug)
     except Exception as e:
         if debug:
             print(f"⚠️  Failed to create driver with subprocess mode: {e}")
@@ -148,6 +297,105 @@ Chrome version detected: {chrome_version or 'Unknown'}
 """
     raise RuntimeError(error_msg)
 
+# URL patterns blocked through CDP for each resource blocking profile.
+# Network.setBlockedURLs matches with '*' wildcards against the full request URL.
+BLOCKING_PROFILES = {
+    'none': [],
+    'no_trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*googlesyndication.com*',
+        '*doubleclick.net*', '*adservice.google.*', '*facebook.net*', '*facebook.com/tr*',
+        '*criteo.*', '*taboola.com*', '*outbrain.com*', '*hotjar.com*', '*clarity.ms*',
+        '*wcs.naver.net*', '*analytics.tiktok.com*', '*ads-twitter.com*',
+        '*cnzz.com*', '*hm.baidu.com*', '*umeng.com*'
+    ],
+}
+BLOCKING_PROFILES['text_only'] = BLOCKING_PROFILES['no_trackers'] + [
+    '*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+    '*.webp', '*.webp?*', '*.svg', '*.svg?*', '*.ico', '*.ico?*', '*.avif', '*.avif?*',
+    '*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*', '*.eot', '*.eot?*',
+    '*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.mp3', '*.mp3?*'
+]
+
+def apply_resource_blocking(driver, profile: str = 'text_only', debug: bool = True) -> bool:
+    """
+    Apply a resource blocking profile to the driver through CDP.
+    The profile stays active for every following navigation until another one is applied.
+
+    Args:
+        driver: Chrome WebDriver instance
+        profile (str): Key of BLOCKING_PROFILES ('none', 'no_trackers' or 'text_only')
+        debug (bool): If True, prints debug information
+
+    Returns:
+        bool: True if the profile is active on the driver
+    """
+    if profile not in BLOCKING_PROFILES:
+        raise ValueError(f"Unknown blocking profile: {profile}. Choose from {list(BLOCKING_PROFILES)}")
+
+    # Skip the CDP round trip when the profile is already active
+    if getattr(driver, '_blocking_profile', None) == profile:
+        return True
+
+    try:
+        _set_blocked_urls(driver, profile)
+        driver._blocking_profile = profile
+        if debug:
+            print(f"✅ Resource blocking profile '{profile}' applied ({len(BLOCKING_PROFILES[profile])} patterns)")
+        return True
+    except Exception as e:
+        if debug:
+            print(f"⚠️  Could not apply resource blocking profile '{profile}': {e}")
+        return False
+
+def _set_blocked_urls(driver, profile: str):
+    """Send a blocking profile to the current tab; CDP blocking applies per target"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKING_PROFILES[profile]})
+
+def get_memory_metrics(driver) -> dict:
+    """
+    Read the page's memory-related metrics through CDP Performance.getMetrics.
+    CDP does not expose the renderer's RSS, so the JS heap and DOM node counts serve as its proxy.
+    
+    Args:
+        driver: Chrome WebDriver instance
+        
+    Returns:
+        dict: 'js_heap_used_mb', 'js_heap_total_mb', 'nodes', 'documents' (empty if unavailable)
+    """
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    except Exception:
+        return {}
+    return {
+        'js_heap_used_mb': round(metrics.get('JSHeapUsedSize', 0) / (1024 * 1024), 1),
+        'js_heap_total_mb': round(metrics.get('JSHeapTotalSize', 0) / (1024 * 1024), 1),
+        'nodes': int(metrics.get('Nodes', 0)),
+        'documents': int(metrics.get('Documents', 0))
+    }
+
+def get_bytes_transferred(driver) -> Optional[int]:
+    """
+    Sum the bytes transferred for the current page and its subresources.
+    Uses the Resource Timing API, so cross-origin resources without Timing-Allow-Origin
+    count as 0 and blocked requests are not counted at all.
+
+    Args:
+        driver: WebDriver instance on the page to measure
+
+    Returns:
+        Optional[int]: Total transferSize in bytes, or None if it could not be measured
+    """
+    try:
+        return driver.execute_script("""
+            return performance.getEntriesByType('navigation')
+                .concat(performance.getEntriesByType('resource'))
+                .reduce(function(total, entry) { return total + (entry.transferSize || 0); }, 0);
+        """)
+    except Exception:
+        return None
+
 # The following global variables must be imported from web_scraper.py:
 # - CONFIRMED_HEADERS
 # - session_manager
@@ -325,6 +573,7 @@ def fetch_with_exact_headers(url: str, CONFIRMED_HEADERS: dict, main_id: str = N
         
         # Now navigate to the actual URL with cookies set
         driver.get(url)
+        drain_logs_if_due(driver)
         
         # Add random delay after page load
         time.sleep(random.uniform(2, 5))
@@ -654,6 +903,62 @@ def simulate_human_behavior(driver, debug: bool = True):
         if debug:
             print(f"Error during human behavior simulation: {e}")
 
+# Time spent interacting with loaded pages, per scroll mode, across the run
+PAGE_INTERACTION_STATS = {
+    'human': {'pages': 0, 'seconds': 0.0},
+    'until_stable': {'pages': 0, 'seconds': 0.0}
+}
+
+def scroll_until_content_stable(driver, css_selector: str, interval: float = 0.4, stable_checks: int = 2,
+                                max_seconds: float = 15, debug: bool = True) -> dict:
+    """
+    Loads lazily rendered content by scrolling to the last target element on every check.
+    Stops once `stable_checks` scrolls in a row have not added any elements.
+    
+    Args:
+        driver: The WebDriver instance
+        css_selector (str): Selector of the content elements (e.g. 'font.line')
+        interval (float): Seconds between a scroll and the following count
+        stable_checks (int): Scrolls without growth required before the content counts as complete
+        max_seconds (float): Upper bound on the time spent
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        dict: 'element_count', 'scrolls' and 'seconds' spent
+    """
+    count_js = "return document.querySelectorAll(arguments[0]).length;"
+    scroll_js = ("var els = document.querySelectorAll(arguments[0]);"
+                 "if (els.length) { els[els.length - 1].scrollIntoView({block: 'end'}); }"
+                 "else { window.scrollTo(0, document.body.scrollHeight); }")
+    start = time.time()
+    scrolls = 0
+    stable = 0
+    try:
+        count = driver.execute_script(count_js, css_selector)
+        while time.time() - start < max_seconds:
+            # Bring the end of the content into view so the next batch gets a chance to load
+            driver.execute_script(scroll_js, css_selector)
+            scrolls += 1
+            time.sleep(interval)
+            new_count = driver.execute_script(count_js, css_selector)
+            if new_count == count and new_count > 0:
+                # Only a check that followed a scroll counts towards stability
+                stable += 1
+                if stable >= stable_checks:
+                    break
+            else:
+                stable = 0
+            count = new_count
+    except Exception as e:
+        count = None
+        if debug:
+            print(f"Error while waiting for content to settle: {e}")
+    
+    seconds = time.time() - start
+    if debug:
+        print(f"Content settled: {count} '{css_selector}' elements after {scrolls} scrolls in {seconds:.2f}s")
+    return {'element_count': count, 'scrolls': scrolls, 'seconds': seconds}
+
 def debug_selenium_cookies(driver, url: str, debug: bool = True):
     """
     Comprehensive debugging function to track cookie changes in Selenium.
@@ -1155,6 +1460,7 @@ def fetch_with_exact_headers_preserve_cookies(url: str, CONFIRMED_HEADERS: dict,
         
         # Now navigate to the actual URL with cookies set
         driver.get(url)
+        drain_logs_if_due(driver)
         
         # Add random delay after page load
         time.sleep(random.uniform(2, 5))
@@ -1472,8 +1778,32 @@ def fetch_with_exact_headers_preserve_cookies(url: str, CONFIRMED_HEADERS: dict,
 
 # --- fetch_with_existing_driver variants ---
 
+def _text_only_result(result: Optional[dict]) -> Optional[dict]:
+    """
+    Reduce a fetch result to its extracted strings and free the parsed page.
+    Drops the Selenium and BeautifulSoup element references and decomposes the soup tree
+    they belong to, so a large page does not stay in memory until the next GC cycle.
+    
+    Args:
+        result (dict): Result of one of the fetch_with_existing_driver_* helpers
+        
+    Returns:
+        Optional[dict]: Dictionary with 'content', 'page_info', 'success' (and 'urls' for lists)
+    """
+    if result is None:
+        return None
+    soup_elements = result.get('soup_elements') or []
+    if soup_elements:
+        root = soup_elements[0]
+        while root.parent is not None:
+            root = root.parent
+        root.decompose()
+    return {key: result[key] for key in ('content', 'urls', 'page_info', 'success') if key in result}
+
 def fetch_with_existing_driver_div(driver, url: str, div_id: str = None, div_class: str = None, 
-                                  wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
+                                  wait_time: int = 5, timeout: int = 30, debug: bool = True,
+                                  block_profile: str = None, prefetcher: "TabPrefetcher" = None,
+                                  text_only: bool = False, scroll_mode: str = 'human') -> Optional[dict]:
     """
     Fetches content from div elements using an existing driver instance.
     
@@ -1485,6 +1815,10 @@ def fetch_with_existing_driver_div(driver, url: str, div_id: str = None, div_cla
         wait_time (int): Time to wait for JavaScript rendering
         timeout (int): Timeout for element waiting
         debug (bool): If True, prints debug information
+        text_only (bool): If True, return only 'content', 'page_info' and 'success' and free the parsed page
+        scroll_mode (str): 'human' (simulate_human_behavior) or 'until_stable' (scroll only while content grows)
+        block_profile (str): Resource blocking profile to apply before loading (e.g. 'text_only')
+        prefetcher (TabPrefetcher): Reads the page from its background tab if it was prefetched
     
     Returns:
         Optional[dict]: Dictionary containing:
@@ -1500,7 +1834,7 @@ def fetch_with_existing_driver_div(driver, url: str, div_id: str = None, div_cla
         print(f"Div ID: {div_id}")
         print(f"Div Class: {div_class}")
     
-    return _fetch_with_existing_driver_generic(
+    result = _fetch_with_existing_driver_generic(
         driver=driver,
         url=url,
         element_type="div",
@@ -1508,11 +1842,17 @@ def fetch_with_existing_driver_div(driver, url: str, div_id: str = None, div_cla
         element_class=div_class,
         wait_time=wait_time,
         timeout=timeout,
-        debug=debug
+        debug=debug,
+        block_profile=block_profile,
+        prefetcher=prefetcher,
+        scroll_mode=scroll_mode
     )
+    
+    return _text_only_result(result) if text_only else result
 
 def fetch_with_existing_driver_list(driver, url: str, list_id: str = None, list_class: str = None, 
-                                   parent_div_class: str = None, wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
+                                   parent_div_class: str = None, wait_time: int = 5, timeout: int = 30, debug: bool = True,
+                                   text_only: bool = False) -> Optional[dict]:
     """
     Fetches content from list elements (ul, ol) using an existing driver instance.
     Can filter lists by their class name and/or their parent div's class.
@@ -1526,6 +1866,7 @@ def fetch_with_existing_driver_list(driver, url: str, list_id: str = None, list_
         wait_time (int): Time to wait for JavaScript rendering
         timeout (int): Timeout for element waiting
         debug (bool): If True, prints debug information
+        text_only (bool): If True, return only 'content', 'page_info' and 'success' and free the parsed page
     
     Returns:
         Optional[dict]: Dictionary containing:
@@ -1545,7 +1886,7 @@ def fetch_with_existing_driver_list(driver, url: str, list_id: str = None, list_
     
     # If parent_div_class is specified, we need to use a custom approach
     if parent_div_class:
-        return _fetch_with_existing_driver_list_with_parent(
+        result = _fetch_with_existing_driver_list_with_parent(
             driver=driver,
             url=url,
             list_id=list_id,
@@ -1557,7 +1898,7 @@ def fetch_with_existing_driver_list(driver, url: str, list_id: str = None, list_
         )
     else:
         # Use the existing generic approach for backward compatibility
-        return _fetch_with_existing_driver_generic(
+        result = _fetch_with_existing_driver_generic(
             driver=driver,
             url=url,
             element_type="ul,ol",  # Both ul and ol elements
@@ -1567,6 +1908,8 @@ def fetch_with_existing_driver_list(driver, url: str, list_id: str = None, list_
             timeout=timeout,
             debug=debug
         )
+    
+    return _text_only_result(result) if text_only else result
 
 def fetch_with_existing_driver_section(driver, url: str, section_id: str = None, section_class: str = None, 
                                       wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
@@ -1647,7 +1990,9 @@ def fetch_with_existing_driver_article(driver, url: str, article_id: str = None,
     )
 
 def fetch_with_existing_driver_custom(driver, url: str, element_type: str, element_id: str = None, element_class: str = None, 
-                                     wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
+                                     wait_time: int = 5, timeout: int = 30, debug: bool = True,
+                                     block_profile: str = None, prefetcher: "TabPrefetcher" = None,
+                                     text_only: bool = False, scroll_mode: str = 'human') -> Optional[dict]:
     """
     Fetches content from any custom element type using an existing driver instance.
     
@@ -1660,6 +2005,10 @@ def fetch_with_existing_driver_custom(driver, url: str, element_type: str, eleme
         wait_time (int): Time to wait for JavaScript rendering
         timeout (int): Timeout for element waiting
         debug (bool): If True, prints debug information
+        text_only (bool): If True, return only 'content', 'page_info' and 'success' and free the parsed page
+        scroll_mode (str): 'human' (simulate_human_behavior) or 'until_stable' (scroll only while content grows)
+        block_profile (str): Resource blocking profile to apply before loading (e.g. 'text_only')
+        prefetcher (TabPrefetcher): Reads the page from its background tab if it was prefetched
     
     Returns:
         Optional[dict]: Dictionary containing:
@@ -1676,7 +2025,7 @@ def fetch_with_existing_driver_custom(driver, url: str, element_type: str, eleme
         print(f"Element ID: {element_id}")
         print(f"Element Class: {element_class}")
     
-    return _fetch_with_existing_driver_generic(
+    result = _fetch_with_existing_driver_generic(
         driver=driver,
         url=url,
         element_type=element_type,
@@ -1684,8 +2033,13 @@ def fetch_with_existing_driver_custom(driver, url: str, element_type: str, eleme
         element_class=element_class,
         wait_time=wait_time,
         timeout=timeout,
-        debug=debug
+        debug=debug,
+        block_profile=block_profile,
+        prefetcher=prefetcher,
+        scroll_mode=scroll_mode
     )
+    
+    return _text_only_result(result) if text_only else result
 
 def process_list_content(list_element, debug: bool = True):
     """Special processing for list elements to preserve list structure"""
@@ -1835,8 +2189,126 @@ def process_list_with_urls(list_element, debug: bool = True):
         'urls': list_urls
     }
 
+class TabPrefetcher:
+    """
+    Loads upcoming pages in background tabs of the same browser, so their load time
+    overlaps with extracting and processing the current page.
+    
+    Each tab is opened blank with window.open, gets the blocking profile (CDP blocking
+    is per tab) and only then starts loading its page; focus returns to the main tab.
+    A fetch helper given the prefetcher switches to the page's tab instead of
+    navigating, waits until the page has finished loading, and closes the tab once the
+    content is extracted.
+    """
+    
+    def __init__(self, driver, max_tabs: int = 2, block_profile: str = None, debug: bool = True):
+        """
+        Args:
+            driver: Existing WebDriver instance with authenticated session
+            max_tabs (int): Maximum number of background tabs open at once
+            block_profile (str): Resource blocking profile for the background tabs (see
+                                 BLOCKING_PROFILES); None loads them unfiltered
+            debug (bool): If True, prints debug information
+        """
+        if block_profile is not None and block_profile not in BLOCKING_PROFILES:
+            raise ValueError(f"Unknown blocking profile: {block_profile}. Choose from {list(BLOCKING_PROFILES)}")
+        self.driver = driver
+        self.max_tabs = max_tabs
+        self.block_profile = block_profile
+        self.debug = debug
+        self.main_handle = driver.current_window_handle
+        self.tabs = {}
+        self.stats = {'opened': 0, 'used': 0, 'discarded': 0}
+    
+    def prefetch(self, urls: list):
+        """
+        Start loading pages in background tabs, up to max_tabs at once.
+        
+        Args:
+            urls (list): URLs in the order they will be needed
+        """
+        for url in urls:
+            if url in self.tabs:
+                continue
+            if len(self.tabs) >= self.max_tabs:
+                break
+            try:
+                self.driver.switch_to.window(self.main_handle)
+                before = set(self.driver.window_handles)
+                self.driver.execute_script("window.open('about:blank', '_blank');")
+                opened = [h for h in self.driver.window_handles if h not in before]
+                if not opened:
+                    if self.debug:
+                        print(f"⚠️  Browser did not open a tab for {url}")
+                    break
+                self.tabs[url] = opened[0]
+                self.driver.switch_to.window(opened[0])
+                if self.block_profile is not None:
+                    _set_blocked_urls(self.driver, self.block_profile)
+                # Assigning location returns at once, so the page loads while we move on
+                self.driver.execute_script("window.location.href = arguments[0];", url)
+                self.stats['opened'] += 1
+                if self.debug:
+                    print(f"🔍 Prefetching {url} in a background tab")
+            except Exception as e:
+                if self.debug:
+                    print(f"⚠️  Could not prefetch {url}: {e}")
+                break
+        # Focus stays on the main tab
+        self.driver.switch_to.window(self.main_handle)
+    
+    def activate(self, url: str) -> bool:
+        """
+        Switch to the tab holding a prefetched page.
+        
+        Returns:
+            bool: True if the page was prefetched and its tab is now current
+        """
+        handle = self.tabs.get(url)
+        if handle is None:
+            return False
+        try:
+            self.driver.switch_to.window(handle)
+        except Exception:
+            self.tabs.pop(url, None)
+            return False
+        self.stats['used'] += 1
+        return True
+    
+    def wait_until_loaded(self, timeout: float = 30) -> float:
+        """
+        Wait for the current (activated) tab to finish loading, like driver.get would.
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.time()
+        WebDriverWait(self.driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState;") == 'complete'
+            and d.current_url != 'about:blank')
+        return time.time() - start
+    
+    def release(self, url: str):
+        """Close a prefetched page's tab and return to the main tab"""
+        handle = self.tabs.pop(url, None)
+        if handle is not None:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        self.driver.switch_to.window(self.main_handle)
+    
+    def close_all(self):
+        """Close every background tab, e.g. when the pages are no longer needed"""
+        for url in list(self.tabs):
+            self.stats['discarded'] += 1
+            self.release(url)
+
 def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, element_id: str = None, element_class: str = None, 
-                                       wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
+                                       wait_time: int = 5, timeout: int = 30, debug: bool = True,
+                                       block_profile: str = None, prefetcher: TabPrefetcher = None,
+                                       scroll_mode: str = 'human', _prefetched: bool = False) -> Optional[dict]:
     """
     Generic function that handles fetching content from any element type.
     This is the underlying implementation for all the specific element type functions.
@@ -1850,15 +2322,31 @@ def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, ele
         wait_time (int): Time to wait for JavaScript rendering
         timeout (int): Timeout for element waiting
         debug (bool): If True, prints debug information
+        block_profile (str): Resource blocking profile to apply before loading (see BLOCKING_PROFILES).
+                             None leaves the driver's current blocking unchanged.
+        prefetcher (TabPrefetcher): If the URL was prefetched, its tab is read instead of
+                                    navigating, then closed
+        scroll_mode (str): 'human' runs simulate_human_behavior after loading; 'until_stable'
+                           only scrolls while the target elements are still being added
     
     Returns:
         Optional[dict]: Dictionary containing:
             - 'content': Extracted text content (str or List[str])
             - 'elements': List of Selenium WebElement objects
             - 'soup_elements': List of BeautifulSoup element objects
-            - 'page_info': Dictionary with page title, URL, etc.
+            - 'page_info': Dictionary with page title, URL, load time, bytes transferred, etc.
             - 'success': Boolean indicating if fetch was successful
     """
+    if prefetcher is not None and not _prefetched and prefetcher.activate(url):
+        if debug:
+            print(f"✅ Using prefetched tab for {url}")
+        try:
+            return _fetch_with_existing_driver_generic(driver, url, element_type, element_id, element_class,
+                                                       wait_time, timeout, debug, block_profile, prefetcher,
+                                                       scroll_mode=scroll_mode, _prefetched=True)
+        finally:
+            prefetcher.release(url)
+    
     if debug:
         print(f"Using existing driver with authenticated session")
         print(f"Driver type: {type(driver).__name__}")
@@ -1876,6 +2364,8 @@ def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, ele
         raise ValueError("Either element_id or element_class must be provided")
     if element_id is not None and element_class is not None:
         raise ValueError("Only one of element_id or element_class should be provided")
+    if scroll_mode not in ('human', 'until_stable'):
+        raise ValueError("scroll_mode must be 'human' or 'until_stable'")
 
     try:
         # Check if driver is still valid
@@ -1886,28 +2376,58 @@ def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, ele
         except Exception as e:
             raise Exception(f"Driver is no longer valid: {str(e)}")
         
-        # Add random delay to simulate human behavior
-        if debug:
-            print("Adding random delay to simulate human behavior...")
-        time.sleep(random.uniform(1, 3))
-        
-        if debug:
-            print("Navigating to target URL...")
-        
-        # Navigate to the target URL
-        driver.get(url)
-        
-        # Add random delay after page load
-        time.sleep(random.uniform(2, 5))
-        
-        # Simulate human behavior to avoid detection
-        simulate_human_behavior(driver, debug)
+        if _prefetched:
+            # The page loads in its background tab while earlier pages are processed;
+            # only the part that is still outstanding is waited for here
+            load_seconds = prefetcher.wait_until_loaded(timeout)
+            drain_logs_if_due(driver)
+        else:
+            # Add random delay to simulate human behavior
+            if debug:
+                print("Adding random delay to simulate human behavior...")
+            time.sleep(random.uniform(1, 3))
+            
+            # Skip images, fonts and trackers we never read
+            if block_profile is not None:
+                apply_resource_blocking(driver, block_profile, debug)
+            
+            if debug:
+                print("Navigating to target URL...")
+            
+            # Navigate to the target URL
+            load_start = time.time()
+            driver.get(url)
+            load_seconds = time.time() - load_start
+            drain_logs_if_due(driver)
+            
+            # Add random delay after page load
+            time.sleep(random.uniform(2, 5))
+        
+        interaction_start = time.time()
+        if scroll_mode == 'until_stable':
+            # Scroll only as long as lazily loaded content keeps arriving
+            if element_id is not None:
+                selector = ", ".join(f"{et.strip()}#{element_id}" for et in element_type.split(","))
+            else:
+                selector = ", ".join(f"{et.strip()}.{element_class}" for et in element_type.split(","))
+            scroll_until_content_stable(driver, selector, debug=debug)
+        elif not _prefetched:
+            # Simulate human behavior to avoid detection
+            simulate_human_behavior(driver, debug)
+        interaction_seconds = time.time() - interaction_start
+        PAGE_INTERACTION_STATS[scroll_mode]['pages'] += 1
+        PAGE_INTERACTION_STATS[scroll_mode]['seconds'] += interaction_seconds
         
         # Get page info
         page_info = {
             'title': driver.title,
             'current_url': driver.current_url,
-            'page_source_length': len(driver.page_source)
+            'page_source_length': len(driver.page_source),
+            'load_seconds': round(load_seconds, 3),
+            'bytes_transferred': get_bytes_transferred(driver),
+            'block_profile': prefetcher.block_profile if _prefetched else getattr(driver, '_blocking_profile', None),
+            'prefetched': _prefetched,
+            'interaction_seconds': round(interaction_seconds, 3)
         }
         
         # Debug: Check what we received
@@ -1916,6 +2436,8 @@ def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, ele
             print(f"Current URL: {page_info['current_url']}")
             print(f"Page title: {page_info['title']}")
             print(f"Page source length: {page_info['page_source_length']}")
+            print(f"Page load: {page_info['load_seconds']}s, {page_info['bytes_transferred']} bytes transferred (blocking: {page_info['block_profile']})")
+            print(f"Page interaction ({scroll_mode}): {page_info['interaction_seconds']}s")
             
             # Check if we got redirected
             if page_info['current_url'] != url:
@@ -1975,10 +2497,11 @@ def _fetch_with_existing_driver_generic(driver, url: str, element_type: str, ele
             except Exception as e:
                 print(f"❌ Failed to save page source: {e}")
         
-        # Wait for the page to load
-        if debug:
-            print(f"Waiting {wait_time} seconds for JavaScript to render...")
-        time.sleep(wait_time)
+        # Wait for the page to load (content that settled while scrolling has already rendered)
+        if not _prefetched and scroll_mode != 'until_stable':
+            if debug:
+                print(f"Waiting {wait_time} seconds for JavaScript to render...")
+            time.sleep(wait_time)
         
         # Wait for the specific element to be present
         wait = WebDriverWait(driver, timeout)
@@ -2719,6 +3242,7 @@ def click_page_number(driver, page_number: int, pagination_class: str = "paginat
         
         # Click the element
         target_element.click()
+        drain_logs_if_due(driver)
         
         # Wait for page to load
         if debug:
@@ -2781,6 +3305,7 @@ def click_next_page(driver, pagination_class: str = "pagination",
         
         # Click the element
         pagination_info['next_element'].click()
+        drain_logs_if_due(driver)
         
         # Wait for page to load
         if debug:
@@ -2843,6 +3368,7 @@ def click_prev_page(driver, pagination_class: str = "pagination",
         
         # Click the element
         pagination_info['prev_element'].click()
+        drain_logs_if_due(driver)
         
         # Wait for page to load
         if debug:
@@ -2979,14 +3505,172 @@ def navigate_through_pages(driver, start_page: int = 1, end_page: int = None,
             'current_page': None
         }
 
+# Extracts every episode row in a single execute_script call instead of walking
+# each row and cell over the WebDriver protocol.
+_EPISODE_TABLE_JS_FUNCTION = """
+function extractEpisodes(root, rowClass, episodeNoAttr, tdClass) {
+var rows = root.querySelectorAll('tr.' + rowClass);
+var episodes = [];
+function text(el) { return el ? (el.innerText || el.textContent || '').trim() : null; }
+for (var i = 0; i < rows.length; i++) {
+    var row = rows[i];
+    var episodeNo = row.getAttribute(episodeNoAttr);
+    if (!episodeNo) { continue; }
+    var cell = row.querySelector('td.' + tdClass) || row.querySelector('td[onclick]') || row.querySelector('td');
+    var episode = {
+        index: i,
+        episode_no: parseInt(episodeNo, 10),
+        link: null,
+        text_content: null,
+        title: null,
+        episode_label: null,
+        view_count: null,
+        date: null,
+        flags: []
+    };
+    if (cell) {
+        episode.text_content = text(cell);
+        var titleEl = cell.querySelector('b');
+        if (titleEl) { episode.title = text(titleEl); }
+        var labelEl = cell.querySelector("span[style*='background-color: #eee']");
+        if (labelEl) { episode.episode_label = text(labelEl); }
+        var viewEl = cell.querySelector('span.episode_count_view');
+        if (viewEl) {
+            var views = parseInt(text(viewEl).replace(/,/g, ''), 10);
+            if (!isNaN(views)) { episode.view_count = views; }
+        }
+        var dateEl = cell.querySelector("b[style*='font: normal normal bold 12px']");
+        if (dateEl) { episode.date = text(dateEl); }
+        var linkEl = cell.getAttribute('href') ? cell : (cell.querySelector('a[href]') || row.querySelector('a[href]'));
+        if (linkEl) { episode.link = linkEl.href || linkEl.getAttribute('href'); }
+    }
+    var badges = row.querySelectorAll("span[class*='badge'], span[class^='b_'], span[class*=' b_']");
+    for (var j = 0; j < badges.length; j++) {
+        var badge = text(badges[j]);
+        if (badge) { episode.flags.push(badge); }
+    }
+    if (row.querySelector("i[class*='lock']")) { episode.flags.push('locked'); }
+    episodes.push(episode);
+}
+return episodes;
+}
+"""
+
+_EPISODE_TABLE_JS = _EPISODE_TABLE_JS_FUNCTION + """
+return extractEpisodes(document, arguments[0], arguments[1], arguments[2]);
+"""
+
+def _extract_episode_table_js(driver, row_class: str = "ep_style5",
+                              episode_no_attr: str = "data-episode-no",
+                              clickable_td_class: str = "font12",
+                              timeout: int = 10, debug: bool = True) -> Optional[list]:
+    """
+    Extracts the whole episode table with one execute_script call per poll.
+    
+    Args:
+        driver: Existing WebDriver instance with authenticated session
+        row_class (str): CSS class of episode rows
+        episode_no_attr (str): Attribute name containing episode number
+        clickable_td_class (str): CSS class of clickable table cells
+        timeout (int): Maximum time to wait for the rows to appear
+        debug (bool): If True, prints debug information
+    
+    Returns:
+        Optional[list]: List of episode dictionaries (episode_no, title, flags, ...),
+        or None if the rows never appeared or the script failed
+    """
+    try:
+        episodes = WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script(_EPISODE_TABLE_JS, row_class, episode_no_attr, clickable_td_class) or False
+        )
+    except TimeoutException:
+        if debug:
+            print("❌ JS extractor found no episode rows")
+        return None
+    except Exception as e:
+        if debug:
+            print(f"⚠️  JS extractor failed, falling back to WebElement path: {e}")
+        return None
+    
+    for episode in episodes:
+        # Keep the same keys as the WebElement path; elements are looked up lazily when clicking
+        episode['row_element'] = None
+        episode['clickable_element'] = None
+    
+    if debug:
+        print(f"✅ JS extractor found {len(episodes)} episodes in one call")
+    
+    return episodes
+
+def _click_episode_element(driver, target_element, episode_number: int, wait_time: int = 2, debug: bool = True):
+    """
+    Clicks an episode cell, falling back to a JavaScript click.
+    
+    Returns:
+        tuple: (clicked_episode, click_success)
+    """
+    if debug:
+        print(f"Clicking on episode {episode_number}...")
+    
+    try:
+        # Ensure the target element is visible and clickable
+        if debug:
+            print("Ensuring target element is visible...")
+        
+        # Scroll to the specific target element
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", target_element)
+        time.sleep(0.5)
+        
+        # Wait for element to be clickable
+        wait = WebDriverWait(driver, 5)
+        wait.until(EC.element_to_be_clickable(target_element))
+        
+        # Click the element
+        target_element.click()
+        drain_logs_if_due(driver)
+        
+        # Wait for page to load
+        if debug:
+            print(f"Waiting {wait_time} seconds for page to load...")
+        time.sleep(wait_time)
+        
+        if debug:
+            print(f"✅ Successfully clicked episode {episode_number}")
+        
+        return episode_number, True
+            
+    except Exception as e:
+        if debug:
+            print(f"❌ Error clicking episode {episode_number}: {e}")
+            print("Trying alternative click method...")
+        
+        try:
+            # Alternative click method using JavaScript
+            driver.execute_script("arguments[0].click();", target_element)
+            time.sleep(wait_time)
+            
+            if debug:
+                print(f"✅ Successfully clicked episode {episode_number} using JavaScript")
+            
+            return episode_number, True
+                
+        except Exception as js_error:
+            if debug:
+                print(f"❌ JavaScript click also failed: {js_error}")
+            return None, False
+
 def interact_with_episode_table(driver, table_selector: str = "tbody", 
                                row_class: str = "ep_style5", 
                                episode_no_attr: str = "data-episode-no",
                                clickable_td_class: str = "font12",
-                               episode_number: int = None, wait_time: int = 2, debug: bool = True) -> Optional[dict]:
+                               episode_number: int = None, wait_time: int = 2, debug: bool = True,
+                               use_js: bool = True) -> Optional[dict]:
     """
     Helper function to interact with episode tables.
     
+    By default the table is read with a single JavaScript extractor call; the
+    per-row WebElement path is kept as a fallback when the extractor finds nothing.
+    
     Args:
         driver: Existing WebDriver instance with authenticated session
         table_selector (str): CSS selector for the table body (default: "tbody")
@@ -2996,6 +3680,8 @@ def interact_with_episode_table(driver, table_selector: str = "tbody",
         episode_number (int, optional): If provided, automatically clicks on this episode
         wait_time (int): Time to wait after clicking (if episode_number is provided)
         debug (bool): If True, prints debug information
+        use_js (bool): If True, extract the table with one execute_script call
+                       (episodes then carry no WebElements)
     
     Returns:
         Optional[dict]: Dictionary containing:
@@ -3015,6 +3701,42 @@ def interact_with_episode_table(driver, table_selector: str = "tbody",
             print(f"Will click on episode number: {episode_number}")
     
     try:
+        if use_js:
+            episodes = _extract_episode_table_js(driver, row_class, episode_no_attr, clickable_td_class, debug=debug)
+            if episodes:
+                clicked_episode = None
+                click_success = False
+                
+                if episode_number is not None:
+                    # Only the target cell is looked up as a WebElement
+                    target_element = None
+                    if any(ep['episode_no'] == episode_number for ep in episodes):
+                        row_selector = f"tr.{row_class}[{episode_no_attr}='{episode_number}']"
+                        cells = driver.find_elements(By.CSS_SELECTOR, f"{row_selector} td.{clickable_td_class}")
+                        if not cells:
+                            cells = driver.find_elements(By.CSS_SELECTOR, f"{row_selector} td")
+                        if cells:
+                            target_element = cells[0]
+                    
+                    if target_element is not None:
+                        clicked_episode, click_success = _click_episode_element(
+                            driver, target_element, episode_number, wait_time, debug
+                        )
+                    elif debug:
+                        print(f"❌ Episode number {episode_number} not found")
+                        print(f"Available episodes: {[ep['episode_no'] for ep in episodes]}")
+                
+                return {
+                    'episodes': episodes,
+                    'total_episodes': len(episodes),
+                    'clicked_episode': clicked_episode,
+                    'click_success': click_success,
+                    'success': True
+                }
+            
+            if debug:
+                print("Falling back to WebElement table extraction...")
+        
         # Wait for page to load and look for episode-related elements
         if debug:
             print("Waiting for page to load and looking for episode elements...")
@@ -3304,56 +4026,9 @@ def interact_with_episode_table(driver, table_selector: str = "tbody",
         click_success = False
         
         if episode_number is not None and target_element is not None:
-            if debug:
-                print(f"Clicking on episode {episode_number}...")
-            
-            try:
-                # Ensure the target element is visible and clickable
-                if debug:
-                    print("Ensuring target element is visible...")
-                
-                # Scroll to the specific target element
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", target_element)
-                time.sleep(0.5)
-                
-                # Wait for element to be clickable
-                wait = WebDriverWait(driver, 5)
-                wait.until(EC.element_to_be_clickable(target_element))
-                
-                # Click the element
-                target_element.click()
-                
-                # Wait for page to load
-                if debug:
-                    print(f"Waiting {wait_time} seconds for page to load...")
-                time.sleep(wait_time)
-                
-                clicked_episode = episode_number
-                click_success = True
-                
-                if debug:
-                    print(f"✅ Successfully clicked episode {episode_number}")
-                    
-            except Exception as e:
-                if debug:
-                    print(f"❌ Error clicking episode {episode_number}: {e}")
-                    print("Trying alternative click method...")
-                
-                try:
-                    # Alternative click method using JavaScript
-                    driver.execute_script("arguments[0].click();", target_element)
-                    time.sleep(wait_time)
-                    
-                    clicked_episode = episode_number
-                    click_success = True
-                    
-                    if debug:
-                        print(f"✅ Successfully clicked episode {episode_number} using JavaScript")
-                        
-                except Exception as js_error:
-                    if debug:
-                        print(f"❌ JavaScript click also failed: {js_error}")
-                    click_success = False
+            clicked_episode, click_success = _click_episode_element(
+                driver, target_element, episode_number, wait_time, debug
+            )
                     
         elif episode_number is not None and target_element is None:
             if debug:
@@ -3614,6 +4289,644 @@ def navigate_episodes(driver, start_episode: int = None, end_episode: int = None
             'current_episode': None
         }
 
+class LogDrainer:
+    """
+    Periodically pulls Chrome's performance and browser logs so chromedriver does not
+    buffer them for the whole run.
+    
+    WebDriver connections are not thread-safe, so draining happens on the thread that
+    drives the browser, between commands: after navigations (drain_logs_if_due) and when
+    a paused_log_drainer block ends. A drain only runs once `interval` seconds have passed.
+    
+    Entries are discarded unless keep_filter accepts them; kept entries go into a
+    bounded buffer of at most `cap` entries (oldest dropped first).
+    """
+    
+    def __init__(self, driver, interval: float = 15.0, cap: int = 1000,
+                 log_types: tuple = ('performance', 'browser'), keep_filter=None, debug: bool = False):
+        """
+        Initialize the drainer without starting it.
+        
+        Args:
+            driver: WebDriver created with goog:loggingPrefs
+            interval (float): Minimum seconds between drains
+            cap (int): Maximum number of kept entries
+            log_types (tuple): Log types to drain
+            keep_filter (callable, optional): Called with (log_type, entry); entries for
+                                              which it returns True are kept
+            debug (bool): If True, prints debug information
+        """
+        self.driver = driver
+        self.interval = interval
+        self.log_types = log_types
+        self.keep_filter = keep_filter
+        self.debug = debug
+        self.kept = deque(maxlen=cap)
+        self.stats = {'drains': 0, 'entries_drained': 0, 'entries_kept': 0, 'entries_dropped': 0}
+        self.active = False
+        self._paused = 0
+        self._failures = 0
+        self._next_drain = 0.0
+    
+    def start(self):
+        """Start draining at the next opportunity after `interval` seconds"""
+        if self.active:
+            return self
+        self.active = True
+        self._failures = 0
+        self._next_drain = time.time() + self.interval
+        if self.debug:
+            print(f"✅ Log drainer started (every {self.interval}s, cap {self.kept.maxlen})")
+        return self
+    
+    def stop(self):
+        """Stop draining"""
+        self.active = False
+        if self.debug:
+            print(f"Log drainer stopped: {self.stats}")
+    
+    @contextmanager
+    def paused(self):
+        """Hold off draining, e.g. while code reads the performance log itself"""
+        self._paused += 1
+        try:
+            yield self
+        finally:
+            self._paused -= 1
+        self.drain_if_due()
+    
+    def drain_if_due(self) -> int:
+        """
+        Drain if the drainer is running, not paused and `interval` seconds have passed.
+        
+        Returns:
+            int: Number of entries pulled (0 if no drain was due)
+        """
+        if not self.active or self._paused or time.time() < self._next_drain:
+            return 0
+        self._next_drain = time.time() + self.interval
+        try:
+            pulled = self.drain()
+            self._failures = 0
+            return pulled
+        except Exception as e:
+            # The driver was probably quit; give up after a few attempts
+            self._failures += 1
+            if self.debug:
+                print(f"⚠️  Log drain failed ({self._failures}): {e}")
+            if self._failures >= 3:
+                self.active = False
+            return 0
+    
+    def drain(self) -> int:
+        """
+        Pull all pending log entries now.
+        
+        Returns:
+            int: Number of entries pulled
+        """
+        pulled = 0
+        for log_type in self.log_types:
+            entries = self.driver.get_log(log_type)
+            pulled += len(entries)
+            if self.keep_filter is None:
+                continue
+            for entry in entries:
+                if self.keep_filter(log_type, entry):
+                    if len(self.kept) == self.kept.maxlen:
+                        self.stats['entries_dropped'] += 1
+                    self.kept.append((log_type, entry))
+                    self.stats['entries_kept'] += 1
+        self.stats['drains'] += 1
+        self.stats['entries_drained'] += pulled
+        return pulled
+    
+    def pop_kept(self) -> list:
+        """Return and clear the kept (log_type, entry) pairs"""
+        kept = list(self.kept)
+        self.kept.clear()
+        return kept
+
+def start_log_drainer(driver, interval: float = 15.0, cap: int = 1000, keep_filter=None, debug: bool = True) -> LogDrainer:
+    """
+    Attach a LogDrainer to the driver (as driver._log_drainer) and start it.
+    An existing drainer on the driver is stopped first.
+    
+    Args:
+        driver: WebDriver created with goog:loggingPrefs
+        interval (float): Minimum seconds between drains
+        cap (int): Maximum number of kept entries
+        keep_filter (callable, optional): See LogDrainer
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        LogDrainer: The running drainer
+    """
+    existing = getattr(driver, '_log_drainer', None)
+    if existing is not None:
+        existing.stop()
+    drainer = LogDrainer(driver, interval=interval, cap=cap, keep_filter=keep_filter, debug=debug)
+    driver._log_drainer = drainer
+    return drainer.start()
+
+def drain_logs_if_due(driver) -> int:
+    """Let the driver's log drainer, if it has one, drain between commands"""
+    drainer = getattr(driver, '_log_drainer', None)
+    return drainer.drain_if_due() if drainer is not None else 0
+
+def paused_log_drainer(driver):
+    """Context manager pausing the driver's log drainer, if it has one"""
+    drainer = getattr(driver, '_log_drainer', None)
+    return drainer.paused() if drainer is not None else nullcontext()
+
+def get_performance_events(driver, methods: list = None) -> list:
+    """
+    Reads (and thereby clears) the Chrome performance log and returns the
+    decoded DevTools events.
+    
+    Requires the driver to be created with goog:loggingPrefs {'performance': 'ALL'},
+    which manual_login does.
+    
+    Args:
+        driver: Existing WebDriver instance
+        methods (list, optional): If provided, only events with these DevTools
+                                  method names (e.g. 'Network.requestWillBeSent') are returned
+    
+    Returns:
+        list: DevTools event dictionaries with 'method' and 'params' keys
+    """
+    try:
+        with paused_log_drainer(driver):
+            entries = driver.get_log('performance')
+    except Exception:
+        return []
+    
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        if methods is None or message.get('method') in methods:
+            events.append(message)
+    return events
+
+def fetch_with_network_capture(driver, url: str, url_pattern: str, timeout: int = 15,
+                               block_profile: str = None, debug: bool = True) -> dict:
+    """
+    Navigates to a URL and captures the body of the first network response whose
+    URL matches a pattern, using the CDP Network domain that manual_login enables.
+    
+    This reads a page's data payload (e.g. a chapter's XHR response) directly, without
+    waiting for the page to render it into the DOM.
+    
+    Args:
+        driver: Existing WebDriver instance created with performance logging
+        url (str): URL to navigate to
+        url_pattern (str): Regular expression searched in response URLs
+        timeout (int): Seconds to wait for the matching response to finish loading
+        block_profile (str): Resource blocking profile to apply before loading (see BLOCKING_PROFILES)
+        debug (bool): If True, prints debug information
+    
+    Returns:
+        dict: Dictionary containing:
+            - 'body': Response body (str), or None if nothing matched
+            - 'response_url': URL of the captured response
+            - 'status': HTTP status of the captured response
+            - 'mime_type': MIME type of the captured response
+            - 'page_info': Dictionary with page title, URL, load time and capture time
+            - 'success': Boolean indicating if a body was captured
+    """
+    import re
+    import base64
+    
+    pattern = re.compile(url_pattern)
+    result = {
+        'body': None,
+        'response_url': None,
+        'status': None,
+        'mime_type': None,
+        'page_info': {},
+        'success': False
+    }
+    
+    if block_profile is not None:
+        apply_resource_blocking(driver, block_profile, debug)
+    
+    # Keep the drainer away from the log until the response has been found
+    with paused_log_drainer(driver):
+        # Drop events from earlier pages
+        get_performance_events(driver)
+        
+        time.sleep(random.uniform(1, 3))
+        load_start = time.time()
+        driver.get(url)
+        load_seconds = time.time() - load_start
+        
+        matches = {}
+        finished = set()
+        request_id = None
+        deadline = time.time() + timeout
+        while request_id is None and time.time() < deadline:
+            for event in get_performance_events(driver, ['Network.responseReceived', 'Network.loadingFinished']):
+                params = event.get('params', {})
+                if event['method'] == 'Network.responseReceived':
+                    response = params.get('response', {})
+                    if pattern.search(response.get('url', '')):
+                        matches[params['requestId']] = response
+                else:
+                    finished.add(params.get('requestId'))
+            done = [rid for rid in matches if rid in finished]
+            if done:
+                request_id = done[0]
+            else:
+                time.sleep(0.2)
+        
+        result['page_info'] = {
+            'title': driver.title,
+            'current_url': driver.current_url,
+            'load_seconds': round(load_seconds, 3),
+            'capture_seconds': round(time.time() - load_start, 3)
+        }
+        
+        if request_id is None:
+            if debug:
+                print(f"❌ No finished response matching '{url_pattern}' within {timeout}s ({len(matches)} matched but unfinished)")
+            return result
+        
+        response = matches[request_id]
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            if debug:
+                print(f"❌ Could not read response body for {response.get('url')}: {e}")
+            return result
+    
+    content = body.get('body', '')
+    if body.get('base64Encoded'):
+        content = base64.b64decode(content).decode('utf-8', errors='replace')
+    
+    result.update({
+        'body': content,
+        'response_url': response.get('url'),
+        'status': response.get('status'),
+        'mime_type': response.get('mimeType'),
+        'success': True
+    })
+    if debug:
+        print(f"✅ Captured {len(content)} characters from {result['response_url']} "
+              f"(status {result['status']}, {result['page_info']['capture_seconds']}s)")
+    return result
+
+def _find_page_param(params: dict, page_number: int):
+    """Returns (name, offset) of the parameter carrying the page number, or (None, None)."""
+    # Prefer a 1-based match, then a 0-based one
+    for offset in (0, -1):
+        for name, value in params.items():
+            if str(value) == str(page_number + offset):
+                return name, offset
+    return None, None
+
+def discover_pagination_request(driver, page_number: int = 2, pagination_class: str = "pagination",
+                                wait_time: int = 1, debug: bool = True) -> Optional[dict]:
+    """
+    Clicks a pagination link once and works out how that page was loaded, so
+    further pages can be requested directly instead of clicked through.
+    
+    Two patterns are recognised:
+        - 'url': the page number appears in the query string of the new page URL
+        - 'xhr': the page number appears in the query string or body of an XHR/fetch
+                 request observed through the CDP performance log
+    
+    Args:
+        driver: Existing WebDriver instance on the table of contents page
+        page_number (int): Page to click while observing the request (default: 2)
+        pagination_class (str): CSS class of the pagination container
+        wait_time (int): Time to wait after clicking
+        debug (bool): If True, prints debug information
+    
+    Returns:
+        Optional[dict]: Dictionary containing:
+            - 'kind': 'url', 'xhr' or 'single_page' (no such page to click)
+            - 'method', 'url', 'body', 'body_format', 'headers': Request template
+            - 'param': Name of the page parameter
+            - 'location': 'query' or 'body'
+            - 'offset': Difference between the parameter value and the page number
+            - 'clicked_page': Page that is now displayed
+        None if the page was clicked but its request could not be identified
+    """
+    # The log drainer must not take the click's requests before we read them
+    with paused_log_drainer(driver):
+        return _discover_pagination_request(driver, page_number, pagination_class, wait_time, debug)
+
+def _discover_pagination_request(driver, page_number: int, pagination_class: str,
+                                 wait_time: int, debug: bool) -> Optional[dict]:
+    from urllib.parse import parse_qsl
+    
+    if debug:
+        print(f"\n=== Discovering Pagination Request ===")
+    
+    # Drop everything logged so far so only the click's requests are inspected
+    get_performance_events(driver)
+    url_before = driver.current_url
+    
+    pagination = interact_with_pagination(driver, pagination_class=pagination_class,
+                                          page_number=page_number, wait_time=wait_time, debug=debug)
+    if not pagination['click_success']:
+        if debug:
+            print("Only one page of episodes - nothing to discover")
+        return {'kind': 'single_page', 'clicked_page': None}
+    
+    # Pattern 1: the page number is part of the page URL
+    url_after = driver.current_url
+    if url_after != url_before:
+        query = dict(parse_qsl(urlparse(url_after).query))
+        param, offset = _find_page_param(query, page_number)
+        if param:
+            if debug:
+                print(f"✅ Page URL pattern found: {param} in {url_after}")
+            return {
+                'kind': 'url',
+                'method': 'GET',
+                'url': url_after,
+                'body': None,
+                'body_format': None,
+                'headers': {},
+                'param': param,
+                'location': 'query',
+                'offset': offset,
+                'clicked_page': page_number
+            }
+    
+    # Pattern 2: the page was loaded by an XHR/fetch request
+    events = get_performance_events(driver, methods=['Network.requestWillBeSent'])
+    for event in events:
+        params = event.get('params', {})
+        if params.get('type') not in ('XHR', 'Fetch'):
+            continue
+        request = params.get('request', {})
+        request_url = request.get('url', '')
+        post_data = request.get('postData')
+        request_headers = {k: v for k, v in request.get('headers', {}).items()
+                           if k.lower() in ('content-type', 'x-requested-with', 'accept')}
+        
+        query = dict(parse_qsl(urlparse(request_url).query))
+        param, offset = _find_page_param(query, page_number)
+        location = 'query'
+        body = None
+        body_format = None
+        
+        if not param and post_data:
+            try:
+                body = json.loads(post_data)
+                body_format = 'json'
+            except ValueError:
+                body = dict(parse_qsl(post_data, keep_blank_values=True))
+                body_format = 'form'
+            if isinstance(body, dict):
+                param, offset = _find_page_param(body, page_number)
+                location = 'body'
+        
+        if param:
+            if debug:
+                print(f"✅ Pagination XHR found: {request.get('method')} {request_url} ({param}, offset {offset})")
+            return {
+                'kind': 'xhr',
+                'method': request.get('method', 'GET'),
+                'url': request_url,
+                'body': body,
+                'body_format': body_format,
+                'headers': request_headers,
+                'param': param,
+                'location': location,
+                'offset': offset,
+                'clicked_page': page_number
+            }
+    
+    if debug:
+        print(f"❌ Could not identify the pagination request among {len(events)} requests")
+    return None
+
+def _build_page_request(template: dict, page: int) -> dict:
+    """Fills a discovered pagination template in for one page."""
+    from urllib.parse import parse_qsl, urlencode, urlunparse
+    
+    value = page + template['offset']
+    url = template['url']
+    body = template['body']
+    
+    if template['location'] == 'query':
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        query[template['param']] = str(value)
+        url = urlunparse(parsed._replace(query=urlencode(query)))
+    else:
+        body = dict(body)
+        body[template['param']] = value if template['body_format'] == 'json' else str(value)
+    
+    if body is None:
+        encoded_body = None
+    elif template['body_format'] == 'json':
+        encoded_body = json.dumps(body)
+    else:
+        encoded_body = urlencode(body)
+    
+    return {
+        'url': url,
+        'method': template['method'],
+        'body': encoded_body,
+        'headers': template['headers']
+    }
+
+# Fetches several table of contents pages in parallel from inside the browser,
+# so the session cookies are sent as-is, and parses each with the episode extractor.
+_FETCH_EPISODE_PAGES_JS = _EPISODE_TABLE_JS_FUNCTION + """
+var requests = arguments[0], rowClass = arguments[1], episodeNoAttr = arguments[2], tdClass = arguments[3];
+var done = arguments[arguments.length - 1];
+function findTableHtml(value) {
+    if (typeof value === 'string') { return value.indexOf('<tr') !== -1 ? value : null; }
+    if (value && typeof value === 'object') {
+        for (var key in value) {
+            var found = findTableHtml(value[key]);
+            if (found) { return found; }
+        }
+    }
+    return null;
+}
+function parsePage(body) {
+    var html = body;
+    try { html = findTableHtml(JSON.parse(body)) || ''; } catch (e) {}
+    if (html.indexOf('<table') === -1) { html = '<table>' + html + '</table>'; }
+    var doc = new DOMParser().parseFromString(html, 'text/html');
+    return extractEpisodes(doc, rowClass, episodeNoAttr, tdClass);
+}
+Promise.all(requests.map(function (r) {
+    return fetch(r.url, {method: r.method, body: r.body, headers: r.headers, credentials: 'include'})
+        .then(function (response) { return response.ok ? response.text() : null; })
+        .then(function (body) { return body === null ? null : parsePage(body); })
+        .catch(function () { return null; });
+})).then(done);
+"""
+
+def fetch_episode_pages(driver, template: dict, pages: list, row_class: str = "ep_style5",
+                        episode_no_attr: str = "data-episode-no", clickable_td_class: str = "font12",
+                        timeout: int = 60, debug: bool = True) -> list:
+    """
+    Fetches several table of contents pages concurrently using a template from
+    discover_pagination_request.
+    
+    The requests are issued with fetch() inside the authenticated browser tab,
+    so any same-origin page can be open while this runs.
+    
+    Args:
+        driver: Existing WebDriver instance with authenticated session
+        template (dict): Request template returned by discover_pagination_request
+        pages (list): Page numbers to fetch
+        row_class (str): CSS class of episode rows
+        episode_no_attr (str): Attribute name containing episode number
+        clickable_td_class (str): CSS class of clickable table cells
+        timeout (int): Script timeout for the whole batch
+        debug (bool): If True, prints debug information
+    
+    Returns:
+        list: One entry per requested page - a list of episode dictionaries, or
+        None if that page failed to load
+    """
+    requests_to_send = [_build_page_request(template, page) for page in pages]
+    
+    if debug:
+        print(f"Fetching TOC pages {pages} concurrently...")
+    
+    driver.set_script_timeout(timeout)
+    results = driver.execute_async_script(
+        _FETCH_EPISODE_PAGES_JS, requests_to_send, row_class, episode_no_attr, clickable_td_class
+    )
+    
+    if debug:
+        for page, episodes in zip(pages, results):
+            print(f"  Page {page}: {'failed' if episodes is None else f'{len(episodes)} episodes'}")
+    
+    return results
+
+def iter_episode_toc(driver, max_concurrency: int = 6, max_pages: int = 1000,
+                     pagination_class: str = "pagination", row_class: str = "ep_style5",
+                     episode_no_attr: str = "data-episode-no", clickable_td_class: str = "font12",
+                     template: dict = None, start_page: int = 1, discovered: dict = None,
+                     debug: bool = True):
+    """
+    Yields every episode of a paginated table of contents, starting with the
+    page that is currently displayed.
+    
+    Instead of clicking through the pagination one page at a time, the request
+    behind page 2 is discovered once and the remaining pages are fetched
+    max_concurrency at a time. Episodes are yielded as soon as each batch
+    arrives, so translation can start while later pages are still loading.
+    If the request cannot be discovered, the pages are clicked through as before
+    and yielded once all of them have been read (the consumer may navigate away
+    between yields).
+    
+    A template saved from an earlier crawl can be passed in together with
+    start_page to resume an incremental crawl without touching the pagination.
+    
+    Args:
+        driver: Existing WebDriver instance on the table of contents page
+        max_concurrency (int): Number of pages fetched per batch
+        max_pages (int): Safety cap on the number of pages
+        pagination_class (str): CSS class of the pagination container
+        row_class (str): CSS class of episode rows
+        episode_no_attr (str): Attribute name containing episode number
+        clickable_td_class (str): CSS class of clickable table cells
+        template (dict, optional): Previously discovered pagination template to reuse
+        start_page (int): First page to fetch when a template is given
+        discovered (dict, optional): If provided, filled with the 'template' and
+                                     'page_size' found during this crawl, and
+                                     'incomplete' if a page failed to load
+        debug (bool): If True, prints debug information
+    
+    Yields:
+        dict: Episode dictionaries as returned by interact_with_episode_table
+        
+    Raises:
+        RuntimeError: If a TOC page fails to load twice before the end of the list was
+                      reached, since the episodes after it would otherwise be silently lost
+    """
+    seen = set()
+    if discovered is None:
+        discovered = {}
+    
+    def new_episodes(episodes):
+        fresh = [ep for ep in episodes if ep['episode_no'] not in seen]
+        seen.update(ep['episode_no'] for ep in fresh)
+        return fresh
+    
+    if template is not None and template.get('kind') in ('url', 'xhr'):
+        if debug:
+            print(f"Resuming TOC crawl at page {start_page} with saved request template")
+        discovered['template'] = template
+        page = start_page
+    else:
+        first_page = interact_with_episode_table(driver, row_class=row_class, episode_no_attr=episode_no_attr,
+                                                 clickable_td_class=clickable_td_class, debug=debug)['episodes']
+        discovered['page_size'] = len(first_page)
+        first_page = new_episodes(first_page)
+        
+        template = discover_pagination_request(driver, page_number=2, pagination_class=pagination_class, debug=debug)
+        discovered['template'] = template
+        
+        if template is not None and template['kind'] == 'single_page':
+            yield from first_page
+            return
+        
+        # Page 2 is on screen now either way
+        second_page = interact_with_episode_table(driver, row_class=row_class, episode_no_attr=episode_no_attr,
+                                                  clickable_td_class=clickable_td_class, debug=debug)['episodes']
+        
+        if template is None:
+            if debug:
+                print("Falling back to clicking through the pagination...")
+            collected = first_page + new_episodes(second_page)
+            page = 3
+            while page <= max_pages:
+                pagination = interact_with_pagination(driver, pagination_class=pagination_class,
+                                                      page_number=page, wait_time=1, debug=debug)
+                if not pagination['click_success']:
+                    break
+                table = interact_with_episode_table(driver, row_class=row_class, episode_no_attr=episode_no_attr,
+                                                    clickable_td_class=clickable_td_class, debug=debug)['episodes']
+                collected.extend(new_episodes(table))
+                page += 1
+            yield from collected
+            return
+        
+        yield from first_page
+        yield from new_episodes(second_page)
+        page = 3
+    
+    while page <= max_pages:
+        pages = list(range(page, min(page + max_concurrency, max_pages + 1)))
+        results = fetch_episode_pages(driver, template, pages, row_class, episode_no_attr,
+                                      clickable_td_class, debug=debug)
+        
+        # Give pages that failed to load one more try
+        failed = [i for i, episodes in enumerate(results) if episodes is None]
+        if failed:
+            retried = fetch_episode_pages(driver, template, [pages[i] for i in failed], row_class,
+                                          episode_no_attr, clickable_td_class, debug=debug)
+            for i, episodes in zip(failed, retried):
+                results[i] = episodes
+        
+        for failed_page, episodes in zip(pages, results):
+            if episodes is None:
+                # A failed request (e.g. a stale template) is not the end of the list
+                discovered['incomplete'] = True
+                raise RuntimeError(f"TOC page {failed_page} failed to load twice; the episode list is incomplete")
+            # An empty or fully repeated page marks the end of the list
+            fresh = new_episodes(episodes)
+            if not fresh:
+                return
+            yield from fresh
+        page += max_concurrency
+
 def _fetch_with_existing_driver_list_with_parent(driver, url: str, list_id: str = None, list_class: str = None, 
                                                 parent_div_class: str = None, wait_time: int = 5, timeout: int = 30, debug: bool = True) -> Optional[dict]:
     """
@@ -3674,6 +4987,7 @@ def _fetch_with_existing_driver_list_with_parent(driver, url: str, list_id: str
         
         # Navigate to the target URL
         driver.get(url)
+        drain_logs_if_due(driver)
         
         # Add random delay after page load
         time.sleep(random.uniform(2, 5))
@@ -3993,6 +5307,7 @@ def _fetch_with_existing_driver_list_with_urls_and_parent(driver, url: str, list
         
         # Navigate to the target URL
         driver.get(url)
+        drain_logs_if_due(driver)
         
         # Add random delay after page load
         time.sleep(random.uniform(2, 5))
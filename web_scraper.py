@@ -1,5 +1,5 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import List, Optional, Callable, Dict, Union
 from urllib.parse import urlparse
 import time
@@ -7,33 +7,75 @@ import re
 import string
 import os
 import json
+import hashlib
+import datetime
+import shutil
 from pathlib import Path
 import base64
-from openai import OpenAI
+import io
+from openai import OpenAI, AsyncOpenAI
 from PIL import Image, ImageEnhance
 import random
 import socket
+import threading
+import weakref
+import asyncio
 from urllib3.exceptions import ProtocolError, MaxRetryError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import httpx
+    import h2
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 
 class NoDuplicatesCookieJar(requests.cookies.RequestsCookieJar):
-    """A CookieJar that prevents duplicate cookies by overwriting existing ones."""
+    """
+    A CookieJar that prevents duplicate cookies by overwriting existing ones.
+    
+    A name -> (domain, path) index finds the cookies to replace without scanning the
+    whole jar. Entries removed by other means (clear, expiry) may leave stale index
+    locations behind; they are skipped when looked up.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._name_index = {}
     
     def set_cookie(self, cookie, *args, **kwargs):
-        # Remove any existing cookies with the same name, domain, and path
-        to_remove = []
-        for domain in self._cookies:
-            for path in self._cookies[domain]:
-                for cookie_name in list(self._cookies[domain][path].keys()):
-                    if cookie_name == cookie.name:
-                        to_remove.append((domain, path, cookie_name))
-        
-        # Remove the old cookies
-        for domain, path, cookie_name in to_remove:
-            del self._cookies[domain][path][cookie_name]
-        
-        # Set the new cookie
-        super().set_cookie(cookie, *args, **kwargs)
+        with self._cookies_lock:
+            # Remove any existing cookies with the same name, whatever their domain and path
+            for domain, path in self._name_index.get(cookie.name, ()):
+                self._cookies.get(domain, {}).get(path, {}).pop(cookie.name, None)
+            
+            # Set the new cookie
+            super().set_cookie(cookie, *args, **kwargs)
+            self._name_index[cookie.name] = {(cookie.domain, cookie.path)}
+    
+    def clear(self, domain=None, path=None, name=None):
+        super().clear(domain, path, name)
+        if domain is None:
+            self._name_index = {}
+    
+    def has_name(self, name: str) -> bool:
+        """True if a cookie with this name is in the jar"""
+        return any(name in self._cookies.get(domain, {}).get(path, {})
+                   for domain, path in self._name_index.get(name, ()))
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if '_name_index' not in self.__dict__:
+            self._name_index = {}
+            for cookie in self:
+                self._name_index.setdefault(cookie.name, set()).add((cookie.domain, cookie.path))
 
 class SessionManager:
     def __init__(self, cookies_file: str = "cookies.json"):
@@ -44,13 +86,19 @@ class SessionManager:
             cookies_file (str): Path to the JSON file storing cookies
         """
         self.cookies_file = cookies_file
+        self._saved_cookies = None
         self.session = requests.Session()
         # Replace the default cookie jar with our custom one
         self.session.cookies = NoDuplicatesCookieJar()
         self.load_cookies()
     
-    def save_cookies(self):
-        """Save current session cookies to file"""
+    def save_cookies(self) -> bool:
+        """
+        Save current session cookies to file if they changed since the last load or save.
+        
+        Returns:
+            bool: True if the file was written
+        """
         # Convert cookies to simple name-value pairs
         cookies_dict = {}
         for cookie in self.session.cookies:
@@ -59,8 +107,16 @@ class SessionManager:
                 continue
             cookies_dict[cookie.name] = cookie.value
         
-        with open(self.cookies_file, 'w') as f:
+        if cookies_dict == self._saved_cookies:
+            return False
+        
+        # Write to a temporary file first so an interrupted save never truncates the cookies
+        tmp_path = self.cookies_file + '.tmp'
+        with open(tmp_path, 'w') as f:
             json.dump(cookies_dict, f)
+        os.replace(tmp_path, self.cookies_file)
+        self._saved_cookies = cookies_dict
+        return True
     
     def load_cookies(self):
         """Load cookies from file if it exists"""
@@ -72,6 +128,7 @@ class SessionManager:
                 # Add cookies as simple name-value pairs
                 for name, value in cookies.items():
                     self.session.cookies.set(name, value)
+                self._saved_cookies = dict(cookies)
         except (FileNotFoundError, json.JSONDecodeError):
             pass  # No cookies file or invalid format
     
@@ -90,7 +147,7 @@ class SessionManager:
             # Special handling for .SFCommunity cookie
             if name == '.SFCommunity':
                 # Ensure we only set it once
-                if not any(c.name == '.SFCommunity' for c in self.session.cookies):
+                if not self.session.cookies.has_name('.SFCommunity'):
                     self.session.cookies.set(name, value)
             else:
                 self.session.cookies.set(name, value)
@@ -120,6 +177,555 @@ class SessionManager:
 # Create a global session manager
 session_manager = SessionManager()
 
+# Connection pool settings shared by the requests sessions and AsyncFetcher
+TRANSPORT_SETTINGS = {
+    'pool_connections': 10,   # Hosts with a pooled connection set
+    'pool_maxsize': 32,       # Kept-alive connections per host
+    'keepalive_expiry': 30.0, # Seconds an idle HTTP/2 connection is kept
+    # Opt-in: HTTP/2 through httpx changes the TLS/HTTP fingerprint CONFIRMED_HEADERS were tuned
+    # against, so site traffic stays on requests/urllib3 unless configure_transport(http2=True)
+    'http2': False
+}
+
+class _HTTPXRawResponse:
+    """Minimal urllib3-style raw object over an httpx response, for Response.raw and streaming"""
+    
+    def __init__(self, httpx_response):
+        self._response = httpx_response
+        self._chunks = None
+        self._buffer = b''
+        self.headers = httpx_response.headers
+        self.status = httpx_response.status_code
+    
+    def stream(self, chunk_size: int = 8192, decode_content: bool = True):
+        try:
+            for chunk in self._response.iter_bytes(chunk_size):
+                yield chunk
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+    
+    def read(self, amt: int = None, decode_content: bool = True) -> bytes:
+        if self._chunks is None:
+            self._chunks = self.stream()
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+    
+    def close(self):
+        self._response.close()
+    
+    def release_conn(self):
+        self._response.close()
+
+class HTTPXAdapter(requests.adapters.BaseAdapter):
+    """
+    requests transport adapter that sends through an httpx client, so a requests.Session
+    can speak HTTP/2 and multiplex concurrent requests over one connection per host.
+    
+    The session still prepares requests (headers, cookies) and follows redirects; the
+    adapter copies cookies from responses into the session's jar because requests can
+    only extract them from urllib3 responses. verify, cert and proxies are honored with one
+    httpx client per combination, and stream=True reads the body lazily through Response.raw.
+    """
+    
+    # Connection-specific headers are not allowed in HTTP/2
+    HOP_BY_HOP_HEADERS = ('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade')
+    
+    def __init__(self, cookie_jar=None, http2: bool = True, pool_maxsize: int = 32, keepalive_expiry: float = 30.0):
+        """
+        Args:
+            cookie_jar: Jar that receives cookies set by responses (the session's cookies)
+            http2 (bool): Negotiate HTTP/2 where the server supports it
+            pool_maxsize (int): Maximum connections kept open
+            keepalive_expiry (float): Seconds an idle connection is kept open
+        """
+        super().__init__()
+        self.cookie_jar = cookie_jar
+        self.http2 = http2
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_expiry = keepalive_expiry
+        self.clients = {}
+        self._client_lock = threading.Lock()
+    
+    def _get_client(self, verify=True, cert=None, proxy: str = None) -> "httpx.Client":
+        """Return the httpx client for these TLS/proxy settings, opening a new one after close()"""
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert), proxy)
+        with self._client_lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = httpx.Client(
+                    http2=self.http2,
+                    follow_redirects=False,
+                    verify=verify,
+                    cert=key[1],
+                    proxy=proxy,
+                    limits=httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize,
+                                        keepalive_expiry=self.keepalive_expiry)
+                )
+                self.clients[key] = client
+            return client
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            httpx_timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        else:
+            httpx_timeout = httpx.Timeout(timeout)
+        request_headers = [(name, value) for name, value in request.headers.items()
+                           if name.lower() not in self.HOP_BY_HOP_HEADERS]
+        httpx_request = httpx.Request(request.method, request.url, headers=request_headers, content=request.body,
+                                      extensions={'timeout': httpx_timeout.as_dict()})
+        client = self._get_client(verify, cert, requests.utils.select_proxy(request.url, proxies or {}))
+        
+        try:
+            httpx_response = client.send(httpx_request, follow_redirects=False, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e), request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+        
+        if self.cookie_jar is not None:
+            for cookie in httpx_response.cookies.jar:
+                self.cookie_jar.set_cookie(cookie)
+        
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(httpx_response.headers.items())
+        response.raw = _HTTPXRawResponse(httpx_response)
+        if not stream:
+            response._content = httpx_response.content
+            response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = httpx_response.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = httpx_response.elapsed if not stream else datetime.timedelta(0)
+        response.http_version = httpx_response.http_version
+        return response
+    
+    def close(self):
+        """Close pooled connections; the adapter stays usable and reconnects on the next send"""
+        with self._client_lock:
+            clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            client.close()
+
+def mount_transport(session: requests.Session, cookie_jar=None):
+    """
+    Mounts the configured transport (TRANSPORT_SETTINGS) on a session.
+    
+    Args:
+        session (requests.Session): Session to configure
+        cookie_jar: Jar for cookies set by responses over HTTP/2 (default: the session's jar)
+    """
+    for adapter in session.adapters.values():
+        adapter.close()
+    if TRANSPORT_SETTINGS['http2'] and H2_AVAILABLE:
+        adapter = HTTPXAdapter(cookie_jar if cookie_jar is not None else session.cookies, http2=True,
+                               pool_maxsize=TRANSPORT_SETTINGS['pool_maxsize'],
+                               keepalive_expiry=TRANSPORT_SETTINGS['keepalive_expiry'])
+    else:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=TRANSPORT_SETTINGS['pool_connections'],
+                                                pool_maxsize=TRANSPORT_SETTINGS['pool_maxsize'])
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+# Cookie-less session for third-party uploads, so site cookies are never sent to them
+_upload_session = requests.Session()
+
+def get_upload_session() -> requests.Session:
+    """Get the pooled session used for uploads (e.g. upload_to_uguu)"""
+    return _upload_session
+
+def configure_transport(pool_connections: int = None, pool_maxsize: int = None, http2: bool = None,
+                        keepalive_expiry: float = None, debug: bool = True) -> dict:
+    """
+    Changes the transport used by every web_scraper request and remounts it on the shared
+    sessions.
+    
+    Args:
+        pool_connections (int, optional): Hosts with a pooled connection set
+        pool_maxsize (int, optional): Kept-alive connections per host
+        http2 (bool, optional): Use HTTP/2 (needs httpx with the h2 package). Off by default
+                                because it changes the connection fingerprint sites see
+        keepalive_expiry (float, optional): Seconds an idle HTTP/2 connection is kept
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        dict: The resulting TRANSPORT_SETTINGS
+    """
+    for key, value in (('pool_connections', pool_connections), ('pool_maxsize', pool_maxsize),
+                       ('http2', http2), ('keepalive_expiry', keepalive_expiry)):
+        if value is not None:
+            TRANSPORT_SETTINGS[key] = value
+    if TRANSPORT_SETTINGS['http2'] and not H2_AVAILABLE:
+        if debug:
+            print("⚠️  HTTP/2 needs httpx and h2 (pip install 'httpx[http2]'), using pooled HTTP/1.1")
+        TRANSPORT_SETTINGS['http2'] = False
+    
+    mount_transport(session_manager.get_session())
+    mount_transport(_upload_session)
+    
+    if debug:
+        print(f"✅ Transport: {'HTTP/2' if TRANSPORT_SETTINGS['http2'] else 'HTTP/1.1'}, "
+              f"{TRANSPORT_SETTINGS['pool_maxsize']} connections per host")
+    return dict(TRANSPORT_SETTINGS)
+
+configure_transport(debug=False)
+
+class RateController:
+    """
+    Per-host AIMD request pacing.
+    
+    Each host gets a request rate (requests per second). Healthy responses raise it
+    additively; WAF challenges (202), 403/429, 5xx, connection errors and latency spikes
+    cut it multiplicatively. Callers reserve a start slot before each request and
+    report the outcome afterwards. Thread-safe, and usable from asyncio through reserve().
+    """
+    
+    def __init__(self, initial_rate: float = 1.0, min_rate: float = 0.02, max_rate: float = 8.0,
+                 increase: float = 0.25, decrease: float = 0.5, slow_factor: float = 2.5, jitter: float = 0.2):
+        """
+        Args:
+            initial_rate (float): Starting rate for a host, in requests per second
+            min_rate (float): Lowest rate (0.02 = one request every 50 seconds)
+            max_rate (float): Highest rate
+            increase (float): Rate added after each healthy response
+            decrease (float): Factor applied to the rate after a throttled response
+            slow_factor (float): A response slower than this multiple of the host's average
+                                 latency counts as a mild congestion signal
+            jitter (float): Random +/- fraction applied to each spacing
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.jitter = jitter
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _host(self, url: str) -> dict:
+        host = urlparse(url).netloc or url
+        state = self._hosts.get(host)
+        if state is None:
+            state = {'rate': self.initial_rate, 'next_time': 0.0, 'latency': None,
+                     'ok': 0, 'throttled': 0, 'errors': 0}
+            self._hosts[host] = state
+        return state
+    
+    def reserve(self, url: str) -> float:
+        """
+        Reserve the next request slot for the URL's host.
+        
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            start = max(now, state['next_time'])
+            spacing = 1.0 / state['rate']
+            state['next_time'] = start + spacing * random.uniform(1 - self.jitter, 1 + self.jitter)
+            return start - now
+    
+    def wait(self, url: str, debug: bool = False) -> float:
+        """Block until the next request slot for the URL's host; returns the seconds waited"""
+        delay = self.reserve(url)
+        if debug:
+            print(f"Rate controller: waiting {delay:.2f}s ({self.current_rate(url):.2f} req/s for {urlparse(url).netloc})")
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+    
+    def record(self, url: str, status_code: int = None, latency: float = None, throttled: bool = None,
+               error: bool = False, retry_after: float = None):
+        """
+        Feed a request outcome back into the host's rate.
+        
+        Args:
+            url (str): Requested URL
+            status_code (int): HTTP status, if a response arrived
+            latency (float): Seconds the request took
+            throttled (bool): Override the status-based classification (e.g. a captcha page with 200)
+            error (bool): True for connection errors and timeouts
+            retry_after (float): Server-requested delay in seconds
+        """
+        if throttled is None:
+            throttled = error or status_code in (202, 403, 429) or (status_code is not None and status_code >= 500)
+        with self._lock:
+            state = self._host(url)
+            slow = False
+            if latency is not None:
+                if state['latency'] is not None and latency > self.slow_factor * state['latency']:
+                    slow = True
+                state['latency'] = latency if state['latency'] is None else 0.8 * state['latency'] + 0.2 * latency
+            if throttled:
+                state['rate'] = max(self.min_rate, state['rate'] * self.decrease)
+                state['errors' if error else 'throttled'] += 1
+            elif slow:
+                state['rate'] = max(self.min_rate, state['rate'] * 0.9)
+                state['ok'] += 1
+            else:
+                state['rate'] = min(self.max_rate, state['rate'] + self.increase)
+                state['ok'] += 1
+            if retry_after:
+                state['next_time'] = max(state['next_time'], time.monotonic() + retry_after)
+    
+    def current_rate(self, url: str) -> float:
+        """Current rate for the URL's host, in requests per second"""
+        with self._lock:
+            return self._host(url)['rate']
+    
+    def snapshot(self) -> dict:
+        """Per-host rate, average latency and outcome counts"""
+        with self._lock:
+            return {host: {key: value for key, value in state.items() if key != 'next_time'}
+                    for host, state in self._hosts.items()}
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """Parse a numeric Retry-After header"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+# Shared pacing for every requests-based fetch
+rate_controller = RateController()
+
+class ResponseCache:
+    """
+    On-disk store of raw page responses for the requests-based fetch functions.
+    
+    Entries are keyed by URL plus the values of the cookies that change what the page
+    shows (the login cookies), so logging in as someone else never replays another
+    account's pages. Each entry keeps the body, headers and ETag/Last-Modified validators:
+    fresh entries are replayed without a request, and stale ones are revalidated with a
+    conditional GET. Freshness depends on the URL class: chapters are revalidated on every
+    fetch because authors edit them. VIP pages and anything that looks like a WAF or captcha
+    challenge are never stored.
+    """
+    
+    # (url class, URL pattern, seconds an entry stays fresh), first match wins
+    DEFAULT_TTL_RULES = [
+        ('catalog', re.compile(r'MainIndex|catalog|/toc\b|/index\b', re.IGNORECASE), 60 * 60),
+        ('chapter', re.compile(r'/(c|chapter|viewer)/|/\d+/\d+/\d+/?$', re.IGNORECASE), 0),
+    ]
+    DEFAULT_TTL = 24 * 60 * 60
+    # Paid chapters depend on the account's purchases, so they always go to the network
+    NO_STORE_PATTERN = re.compile(r'/vip/|vip\.', re.IGNORECASE)
+    # Same markers handle_waf_response treats as a challenge
+    CHALLENGE_HEADERS = ('x-waf-captcha', 'cf-ray', 'cloudflare', 'captcha', 'challenge')
+    CHALLENGE_CONTENT = (b'captcha', b'challenge', b'verify you are human', b'security check', b'cloudflare')
+    
+    def __init__(self, cache_dir: str = "data/http_cache", vary_cookies: tuple = ('.SFCommunity', 'session_PC'),
+                 ttl_rules: list = None, enabled: bool = True):
+        """
+        Args:
+            cache_dir (str): Directory holding one .json (metadata) and one .body file per entry
+            vary_cookies (tuple): Cookie names whose values are part of the cache key
+            ttl_rules (list): (url class, compiled pattern, ttl seconds) rules
+            enabled (bool): If False, every fetch goes to the network
+        """
+        self.cache_dir = cache_dir
+        self.vary_cookies = vary_cookies
+        self.ttl_rules = ttl_rules if ttl_rules is not None else self.DEFAULT_TTL_RULES
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+    
+    def url_class(self, url: str) -> str:
+        """Return the TTL class of a URL ('catalog', 'chapter' or 'default')"""
+        return next((name for name, pattern, _ in self.ttl_rules if pattern.search(url)), 'default')
+    
+    def cacheable(self, url: str) -> bool:
+        """False for URLs that must never be stored or replayed (VIP pages)"""
+        return self.enabled and not self.NO_STORE_PATTERN.search(url)
+    
+    def is_challenge(self, response_headers, body: bytes) -> bool:
+        """True if a response carries WAF/captcha markers in its headers or body"""
+        header_names = [name.lower() for name in response_headers.keys()]
+        if any(marker in name for marker in self.CHALLENGE_HEADERS for name in header_names):
+            return True
+        body_lower = body.lower()
+        return any(marker in body_lower for marker in self.CHALLENGE_CONTENT)
+    
+    def ttl(self, url: str) -> float:
+        """Seconds an entry for this URL is replayed without revalidation"""
+        return next((ttl for _, pattern, ttl in self.ttl_rules if pattern.search(url)), self.DEFAULT_TTL)
+    
+    def _key(self, url: str, cookies) -> str:
+        if isinstance(cookies, dict):
+            items = cookies.items()
+        else:
+            items = ((cookie.name, cookie.value) for cookie in cookies or [])
+        cookie_values = {name: value for name, value in items if name in self.vary_cookies}
+        material = url + '\n' + json.dumps(cookie_values, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.json', base + '.body'
+    
+    def lookup(self, url: str, cookies=None) -> Optional[dict]:
+        """
+        Return the stored entry for a URL, or None.
+        
+        Returns:
+            Optional[dict]: {'url', 'key', 'status_code', 'headers', 'encoding', 'stored_at',
+            'etag', 'last_modified', 'body'} or None
+        """
+        if not self.cacheable(url):
+            return None
+        key = self._key(url, cookies)
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        entry['key'] = key
+        return entry
+    
+    def is_fresh(self, entry: dict) -> bool:
+        """True if the entry can be replayed without contacting the server"""
+        return time.time() - entry['stored_at'] < self.ttl(entry['url'])
+    
+    def conditional_headers(self, entry: Optional[dict]) -> dict:
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        conditional = {}
+        if entry:
+            if entry.get('etag'):
+                conditional['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                conditional['If-Modified-Since'] = entry['last_modified']
+        return conditional
+    
+    def store(self, url: str, cookies, status_code: int, response_headers, body: bytes, encoding: str = None,
+              challenge: bool = False) -> bool:
+        """
+        Store a response if it is a complete page (200 without a WAF/captcha challenge).
+        
+        Args:
+            challenge (bool): True if the caller already flagged the response as a challenge
+            
+        Returns:
+            bool: True if the response was stored
+        """
+        if (challenge or not self.cacheable(url) or status_code != 200
+                or self.is_challenge(response_headers, body)):
+            return False
+        key = self._key(url, cookies)
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        kept_headers = {name: value for name, value in response_headers.items()
+                        if name.lower() in ('content-type', 'etag', 'last-modified', 'content-language')}
+        entry = {
+            'url': url,
+            'status_code': status_code,
+            'headers': kept_headers,
+            'encoding': encoding,
+            'stored_at': time.time(),
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified')
+        }
+        # Body first, so a metadata file always has its body next to it
+        for path, data, mode in ((body_path, body, 'wb'), (meta_path, entry, 'w')):
+            tmp_path = path + '.tmp'
+            if mode == 'wb':
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+            else:
+                with open(tmp_path, mode, encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        self.stats['stored'] += 1
+        return True
+    
+    def touch(self, entry: dict, response_headers=None):
+        """Mark an entry as fresh again after a 304, taking over any new validators"""
+        meta_path, _ = self._paths(entry['key'])
+        entry['stored_at'] = time.time()
+        for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified')):
+            if response_headers is not None and response_headers.get(header):
+                entry[field] = response_headers[header]
+        meta = {field: value for field, value in entry.items() if field not in ('body', 'key')}
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+    
+    def replay(self, entry: dict) -> requests.Response:
+        """Build a requests.Response from a stored entry"""
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response._content = entry['body']
+        response.headers = requests.structures.CaseInsensitiveDict(entry['headers'])
+        response.encoding = entry.get('encoding')
+        response.url = entry['url']
+        response.from_cache = True
+        return response
+    
+    def fetch(self, url: str, cookies, send: Callable[[dict], requests.Response], debug: bool = True) -> requests.Response:
+        """
+        Serve a URL from the cache, revalidate it, or fetch and store it.
+        
+        Args:
+            url (str): Page URL
+            cookies: Cookie jar or dict of the session making the request
+            send (Callable[[dict], requests.Response]): Performs the request; receives the
+                                                        conditional headers to add
+            debug (bool): If True, prints debug information
+            
+        Returns:
+            requests.Response: Network response, or a replayed one (from_cache=True)
+        """
+        entry = self.lookup(url, cookies)
+        if entry is not None and self.is_fresh(entry):
+            self.stats['hits'] += 1
+            if debug:
+                print(f"💾 Cache hit ({self.url_class(url)}): {url}")
+            return self.replay(entry)
+        
+        response = send(self.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            self.touch(entry, response.headers)
+            if debug:
+                print(f"💾 Cache revalidated (304): {url}")
+            return self.replay(entry)
+        
+        self.stats['misses'] += 1
+        self.store(url, cookies, response.status_code, response.headers, response.content, response.encoding,
+                   challenge=getattr(response, 'waf_challenge', False))
+        return response
+    
+    def hit_rate(self) -> float:
+        """Share of lookups answered without downloading the page again"""
+        total = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['revalidated']) / total if total else 0.0
+    
+    def clear(self):
+        """Remove every cached response"""
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+# Shared raw response cache for the fetch functions
+response_cache = ResponseCache()
+
 # Global confirmed working headers that bypass WAF
 CONFIRMED_HEADERS = {
     'Host': 'www.qidian.com',
@@ -254,6 +860,233 @@ def combine_txt_files(directory_path: str, output_filename: str = "combined_outp
     except Exception as e:
         raise Exception(f"Error combining files: {str(e)}")
 
+# Browsers treat these declared charsets as their supersets
+CHARSET_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030', 'iso-8859-1': 'cp1252', 'ascii': 'cp1252'}
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w:.-]+)', re.IGNORECASE)
+
+def decode_html(content: bytes, content_type: str = None) -> str:
+    """
+    Decodes a page body once, using the charset declared in the Content-Type header,
+    then a <meta charset> in the first few KB, then UTF-8.
+    
+    Args:
+        content (bytes): Raw response body
+        content_type (str, optional): Content-Type header value
+        
+    Returns:
+        str: Decoded page
+    """
+    if content.startswith(b'\xef\xbb\xbf'):
+        return content.decode('utf-8-sig', errors='replace')
+    
+    candidates = []
+    if content_type and 'charset=' in content_type.lower():
+        candidates.append(content_type.lower().split('charset=')[-1].split(';')[0].strip(' "\''))
+    match = META_CHARSET_PATTERN.search(content[:4096])
+    if match:
+        candidates.append(match.group(1).decode('ascii', errors='ignore').lower())
+    candidates.append('utf-8')
+    
+    for charset in candidates:
+        try:
+            return content.decode(CHARSET_ALIASES.get(charset, charset), errors='replace')
+        except LookupError:
+            continue
+    return content.decode('utf-8', errors='replace')
+
+def response_html(response) -> str:
+    """Decoded body of a requests or httpx response (see decode_html)"""
+    return decode_html(response.content, response.headers.get('Content-Type'))
+
+def parse_html(html: str, tag=None, element_id: str = None, element_class: str = None, full: bool = False) -> BeautifulSoup:
+    """
+    Parses only the elements a fetch function is going to read.
+    
+    With a tag, id or class, a SoupStrainer keeps just the matching elements and their
+    descendants, which skips building the tree for the rest of the page.
+    
+    Args:
+        html (str): Decoded page
+        tag (str or list, optional): Element name(s) to keep
+        element_id (str, optional): Keep the element with this ID
+        element_class (str, optional): Keep elements with this class
+        full (bool): Parse the whole page (used by debug output that inspects the page)
+        
+    Returns:
+        BeautifulSoup: Parsed (sub)tree
+    """
+    if full or (tag is None and element_id is None and element_class is None):
+        return BeautifulSoup(html, 'html.parser')
+    attrs = {}
+    if element_id is not None:
+        attrs['id'] = element_id
+    if element_class is not None:
+        attrs['class'] = element_class
+    return BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(tag, attrs=attrs))
+
+def benchmark_parsing(html_paths: Union[str, List[str]], tag: str = 'div', element_id: str = None,
+                      element_class: str = None, repeat: int = 5, debug: bool = True) -> dict:
+    """
+    Compares full parsing with targeted parsing on saved pages, e.g. the undetected_debug_*.html
+    dumps or response cache bodies under data/http_cache.
+    
+    Args:
+        html_paths (Union[str, List[str]]): Saved page file(s)
+        tag (str): Element name to extract
+        element_id (str, optional): ID of the element to extract
+        element_class (str, optional): Class of the elements to extract
+        repeat (int): Parses per page and mode
+        debug (bool): If True, prints the timings
+        
+    Returns:
+        dict: {'pages', 'full_seconds', 'targeted_seconds', 'speedup', 'same_output'}
+    """
+    if isinstance(html_paths, str):
+        html_paths = [html_paths]
+    
+    full_seconds = targeted_seconds = 0.0
+    same_output = True
+    for path in html_paths:
+        with open(path, 'rb') as f:
+            html = decode_html(f.read())
+        for _ in range(repeat):
+            start = time.perf_counter()
+            full_result = extract_element_text(parse_html(html, full=True), tag, element_id, element_class)
+            full_seconds += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            targeted_result = extract_element_text(parse_html(html, tag, element_id, element_class), tag, element_id, element_class)
+            targeted_seconds += time.perf_counter() - start
+        same_output = same_output and full_result == targeted_result
+    
+    result = {
+        'pages': len(html_paths),
+        'full_seconds': full_seconds / repeat,
+        'targeted_seconds': targeted_seconds / repeat,
+        'speedup': full_seconds / targeted_seconds if targeted_seconds else None,
+        'same_output': same_output
+    }
+    if debug:
+        print(f"⏱️  Full parse: {result['full_seconds'] * 1000:.1f}ms, targeted parse: "
+              f"{result['targeted_seconds'] * 1000:.1f}ms over {result['pages']} page(s)")
+        if result['speedup']:
+            print(f"⏱️  Speedup: {result['speedup']:.1f}x, same output: {same_output}")
+    return result
+
+def element_to_text(element) -> Optional[str]:
+    """
+    Extracts an element's text, turning <br> and <p> into line breaks and collapsing
+    runs of empty lines into single paragraph breaks.
+    
+    Args:
+        element: BeautifulSoup element (modified in place)
+        
+    Returns:
+        Optional[str]: Cleaned text, or None if element is None
+    """
+    if not element:
+        return None
+        
+    # Replace <br> tags with newlines
+    for br in element.find_all(['br']):
+        br.replace_with('\n')
+    
+    # Replace <p> tags with double newlines
+    for p in element.find_all(['p']):
+        # Add newlines before and after paragraph content
+        p.insert_before('\n')
+        p.append('\n')
+    
+    # Get all text content
+    content = element.get_text()
+    
+    # Clean up the text:
+    # 1. Split into lines and strip each line
+    # 2. Remove empty lines
+    # 3. Join with single newlines
+    lines = [line.strip() for line in content.splitlines()]
+    # Remove empty lines while preserving intentional paragraph breaks
+    cleaned_lines = []
+    prev_empty = False
+    for line in lines:
+        if line:  # If line is not empty
+            cleaned_lines.append(line)
+            prev_empty = False
+        elif not prev_empty:  # If line is empty and previous line wasn't empty
+            cleaned_lines.append('')  # Add one empty line for paragraph break
+            prev_empty = True
+    
+    # Join lines with newlines
+    content = '\n'.join(cleaned_lines)
+    
+    # Remove any leading/trailing whitespace while preserving internal formatting
+    return content.strip()
+
+def extract_element_text(soup, tag: str, element_id: str = None, element_class: str = None) -> Optional[Union[str, List[str]]]:
+    """
+    Finds element(s) in a parsed page and extracts their text like fetch_div_content does.
+    
+    Args:
+        soup: Parsed page
+        tag (str): Element name, e.g. 'div' or 'main'
+        element_id (str, optional): ID of a single element
+        element_class (str, optional): Class name of multiple elements
+        
+    Returns:
+        Optional[Union[str, List[str]]]: String for element_id, list of non-empty strings
+        for element_class, None if nothing matched
+    """
+    if element_id is not None:
+        return element_to_text(soup.find(tag, id=element_id))
+    results = [text for text in (element_to_text(el) for el in soup.find_all(tag, class_=element_class)) if text]
+    return results if results else None
+
+def extract_image_url(soup, page_url: str, img_id: str) -> Optional[str]:
+    """
+    Finds the image of the element with the given ID, from an <img> tag, a
+    background-image style or an <img> inside the element.
+    
+    Args:
+        soup: Parsed page
+        page_url (str): URL of the page, used to make relative image URLs absolute
+        img_id (str): ID of the element containing the image
+        
+    Returns:
+        Optional[str]: Absolute image URL, or None if not found
+    """
+    element = soup.find(id=img_id)
+    if not element:
+        return None
+        
+    image_url = None
+    
+    # Check if the element is an img tag
+    if element.name == 'img':
+        # Try src attribute first, then data-src if src is not available
+        image_url = element.get('src') or element.get('data-src')
+    
+    # If no image URL found, check for background-image in style attribute
+    if not image_url:
+        style = element.get('style', '')
+        if 'background-image' in style:
+            # Extract URL from background-image: url('...')
+            match = re.search(r"background-image:\s*url\(['\"](.*?)['\"]\)", style)
+            if match:
+                image_url = match.group(1)
+    
+    # If still no image URL found, look for img tag inside the element
+    if not image_url and element.find('img'):
+        img_tag = element.find('img')
+        image_url = img_tag.get('src') or img_tag.get('data-src')
+    
+    if image_url and not image_url.startswith(('http://', 'https://')):
+        # Make URL absolute if it's relative
+        parsed_base = urlparse(page_url)
+        base_url = f"{parsed_base.scheme}://{parsed_base.netloc}"
+        image_url = base_url + ('' if image_url.startswith('/') else '/') + image_url
+    
+    return image_url
+
 def fetch_lists_from_url(url: str, list_class: Optional[str] = None, parent_div_class: Optional[str] = None, debug: bool = True) -> List[List[Dict[str, str]]]:
     """
     Fetches all lists (both ordered and unordered) from a given URL.
@@ -298,24 +1131,32 @@ def fetch_lists_from_url(url: str, list_class: Optional[str] = None, parent_div_
         # Get session with cookies
         session = session_manager.get_session()
         
-        # Add a small delay to be respectful
-        time.sleep(1)
+        def send(conditional_headers):
+            # Add a small delay to be respectful
+            time.sleep(1)
+            return session.get(url, headers={**headers, **conditional_headers}, timeout=10)
         
-        # Send HTTP request with headers and session
-        response = session.get(url, headers=headers, timeout=10)
+        # Send HTTP request with headers and session, unless the cache still has the page
+        response = response_cache.fetch(url, session.cookies, send, debug=debug)
         response.raise_for_status()
         
+        # Decode the body once with the declared charset
+        html = response_html(response)
+        
         if debug:
             print("\n=== Debug Information ===")
             print(f"Response Status Code: {response.status_code}")
             print(f"Response Headers: {dict(response.headers)}")
             print(f"Current Cookies: {dict(session.cookies)}")
             print("\nFirst 500 characters of response content:")
-            print(response.text[:500])
+            print(html[:500])
             print("\n=== End Debug Info ===\n")
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse only the lists (or their parent divs) unless debugging the page structure
+        if parent_div_class:
+            soup = parse_html(html, 'div', element_class=parent_div_class, full=debug)
+        else:
+            soup = parse_html(html, ['ul', 'ol'], element_class=list_class, full=debug)
         
         if debug:
             print("\n=== HTML Structure ===")
@@ -467,17 +1308,20 @@ def fetch_div_content(url: str, div_id: str = None, div_class: str = None, debug
                     print("All strategies failed for persistent 202 responses")
                 return None
         
+        # Decode the body once with the declared charset
+        html = response_html(response)
+        
         if debug:
             print("\n=== Debug Information ===")
             print(f"Response Status Code: {response.status_code}")
             print(f"Response Headers: {dict(response.headers)}")
             print(f"Current Cookies: {dict(session.cookies)}")
             print("\nFirst 500 characters of response content:")
-            print(response.text[:500])
+            print(html[:500])
             print("\n=== End Debug Info ===\n")
         
         # Check if we got a captcha challenge
-        if response.status_code == 202 or 'captcha' in response.text.lower():
+        if response.status_code == 202 or 'captcha' in html.lower():
             if debug:
                 print("WARNING: Captcha challenge detected. You may need to:")
                 print("1. Wait a few minutes before trying again")
@@ -485,48 +1329,8 @@ def fetch_div_content(url: str, div_id: str = None, div_class: str = None, debug
                 print("3. Solve the captcha manually in a browser")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        def process_div_content(div_element):
-            """Helper function to process div content consistently"""
-            if not div_element:
-                return None
-                
-            # Replace <br> tags with newlines
-            for br in div_element.find_all(['br']):
-                br.replace_with('\n')
-            
-            # Replace <p> tags with double newlines
-            for p in div_element.find_all(['p']):
-                # Add newlines before and after paragraph content
-                p.insert_before('\n')
-                p.append('\n')
-            
-            # Get all text content
-            content = div_element.get_text()
-            
-            # Clean up the text:
-            # 1. Split into lines and strip each line
-            # 2. Remove empty lines
-            # 3. Join with single newlines
-            lines = [line.strip() for line in content.splitlines()]
-            # Remove empty lines while preserving intentional paragraph breaks
-            cleaned_lines = []
-            prev_empty = False
-            for line in lines:
-                if line:  # If line is not empty
-                    cleaned_lines.append(line)
-                    prev_empty = False
-                elif not prev_empty:  # If line is empty and previous line wasn't empty
-                    cleaned_lines.append('')  # Add one empty line for paragraph break
-                    prev_empty = True
-            
-            # Join lines with newlines
-            content = '\n'.join(cleaned_lines)
-            
-            # Remove any leading/trailing whitespace while preserving internal formatting
-            return content.strip()
+        # Parse only the target div(s) unless debugging the page structure
+        soup = parse_html(html, 'div', div_id, div_class, full=debug)
         
         if div_id is not None:
             # Find div by ID (single div)
@@ -550,7 +1354,7 @@ def fetch_div_content(url: str, div_id: str = None, div_class: str = None, debug
                         print("No divs with IDs found in the page.")
                 print("=== End HTML Structure ===\n")
             
-            return process_div_content(target_div)
+            return element_to_text(target_div)
             
         else:
             # Find divs by class (multiple divs)
@@ -588,7 +1392,7 @@ def fetch_div_content(url: str, div_id: str = None, div_class: str = None, debug
             # Process all found divs
             results = []
             for i, div in enumerate(target_divs):
-                content = process_div_content(div)
+                content = element_to_text(div)
                 if content:
                     results.append(content)
                     if debug:
@@ -626,24 +1430,29 @@ def fetch_image_url(url: str, img_id: str, debug: bool = True) -> Optional[str]:
         # Get session with cookies
         session = session_manager.get_session()
         
-        # Add a small delay to be respectful
-        time.sleep(1)
+        def send(conditional_headers):
+            # Add a small delay to be respectful
+            time.sleep(1)
+            return session.get(url, headers={**headers, **conditional_headers}, timeout=10)
         
-        # Send HTTP request with headers and session
-        response = session.get(url, headers=headers, timeout=10)
+        # Send HTTP request with headers and session, unless the cache still has the page
+        response = response_cache.fetch(url, session.cookies, send, debug=debug)
         response.raise_for_status()
         
+        # Decode the body once with the declared charset
+        html = response_html(response)
+        
         if debug:
             print("\n=== Debug Information ===")
             print(f"Response Status Code: {response.status_code}")
             print(f"Response Headers: {dict(response.headers)}")
             print(f"Current Cookies: {dict(session.cookies)}")
             print("\nFirst 500 characters of response content:")
-            print(response.text[:500])
+            print(html[:500])
             print("\n=== End Debug Info ===\n")
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse only the image element unless debugging the page structure
+        soup = parse_html(html, element_id=img_id, full=debug)
         
         # Find the element with the specified ID
         element = soup.find(id=img_id)
@@ -667,37 +1476,9 @@ def fetch_image_url(url: str, img_id: str, debug: bool = True) -> Optional[str]:
                     print("No elements with IDs found in the page.")
             print("=== End HTML Structure ===\n")
         
-        if not element:
-            return None
-            
-        image_url = None
-        
-        # Check if the element is an img tag
-        if element.name == 'img':
-            # Try src attribute first, then data-src if src is not available
-            image_url = element.get('src') or element.get('data-src')
-        
-        # If no image URL found, check for background-image in style attribute
-        if not image_url:
-            style = element.get('style', '')
-            if 'background-image' in style:
-                # Extract URL from background-image: url('...')
-                match = re.search(r"background-image:\s*url\(['\"](.*?)['\"]\)", style)
-                if match:
-                    image_url = match.group(1)
-        
-        # If still no image URL found, look for img tag inside the element
-        if not image_url and element.find('img'):
-            img_tag = element.find('img')
-            image_url = img_tag.get('src') or img_tag.get('data-src')
+        image_url = extract_image_url(soup, url, img_id)
         
         if image_url:
-            # Make URL absolute if it's relative
-            if not image_url.startswith(('http://', 'https://')):
-                parsed_base = urlparse(url)
-                base_url = f"{parsed_base.scheme}://{parsed_base.netloc}"
-                image_url = base_url + ('' if image_url.startswith('/') else '/') + image_url
-            
             if debug:
                 print(f"Found image URL: {image_url}")
             
@@ -839,20 +1620,92 @@ def download_image(image_url: str, save_path: str, debug: bool = True) -> bool:
         
     except requests.RequestException as e:
         if debug:
-            print(f"Error downloading image: {str(e)}")
-            print(f"Response status code: {getattr(e.response, 'status_code', 'N/A')}")
-            print(f"Response headers: {getattr(e.response, 'headers', {})}")
-        return False
+            print(f"Error downloading image: {str(e)}")
+            print(f"Response status code: {getattr(e.response, 'status_code', 'N/A')}")
+            print(f"Response headers: {getattr(e.response, 'headers', {})}")
+        return False
+    except Exception as e:
+        if debug:
+            print(f"Error: {str(e)}")
+        return False
+
+def download_image_bytes(image_url: str, debug: bool = True) -> Optional[bytes]:
+    """
+    Downloads an image into memory using the current session's cookies.
+    
+    Args:
+        image_url (str): The URL of the image to download
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        Optional[bytes]: The image bytes, or None if the download failed or was not an image
+    """
+    try:
+        result = urlparse(image_url)
+        if not all([result.scheme, result.netloc]):
+            raise ValueError("Invalid URL format")
+        
+        session = session_manager.get_session()
+        img_headers = headers.copy()
+        img_headers.update({
+            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Sec-Fetch-Dest': 'image',
+            'Sec-Fetch-Mode': 'no-cors',
+            'Referer': image_url,
+        })
+        
+        start = time.time()
+        response = session.get(image_url, headers=img_headers, stream=True, timeout=30)
+        response.raise_for_status()
+        
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=65536):
+            buffer.write(chunk)
+        data = buffer.getvalue()
+        
+        content_type = response.headers.get('content-type', '')
+        if not data:
+            raise ValueError("Downloaded image is empty")
+        if not content_type.startswith('image/') and not any(data.startswith(signature) for signature, _ in IMAGE_SIGNATURES):
+            raise ValueError(f"URL does not appear to point to a valid image. Content-type: {content_type}")
+        
+        if debug:
+            print(f"✅ Downloaded {len(data)} bytes in {time.time() - start:.2f}s: {image_url}")
+        return data
+        
     except Exception as e:
         if debug:
-            print(f"Error: {str(e)}")
-        return False
+            print(f"❌ Error downloading image: {str(e)}")
+        return None
 
 # Function to encode the image
 def encode_image(image_path):
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode("utf-8")
 
+IMAGE_SIGNATURES = [
+    (b'\x89PNG', 'image/png'),
+    (b'\xff\xd8', 'image/jpeg'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp')
+]
+
+def image_data_url(image: Union[str, bytes]) -> str:
+    """
+    Encodes an image as an inline data URL for the vision API.
+    
+    Args:
+        image (Union[str, bytes]): Image file path or raw image bytes
+        
+    Returns:
+        str: data:<mime>;base64,... URL
+    """
+    if isinstance(image, str):
+        with open(image, "rb") as image_file:
+            image = image_file.read()
+    mime = next((mime for signature, mime in IMAGE_SIGNATURES if image.startswith(signature)), 'image/png')
+    return f"data:{mime};base64,{base64.b64encode(image).decode('utf-8')}"
+
 def upload_to_uguu(file_path: str, debug: bool = True) -> str:
     """
     Uploads a file to uguu.se and returns the download URL.
@@ -873,11 +1726,12 @@ def upload_to_uguu(file_path: str, debug: bool = True) -> str:
         # Get the filename from the path
         filename = os.path.basename(file_path)
         
-        # Upload the file
-        files = {
-            'files[]': (filename, open(file_path, 'rb'), 'image/jpeg')
-        }
-        response = requests.post('https://uguu.se/upload.php', files=files)
+        # Upload the file over the pooled upload session
+        with open(file_path, 'rb') as f:
+            files = {
+                'files[]': (filename, f, 'image/jpeg')
+            }
+            response = get_upload_session().post('https://uguu.se/upload.php', files=files, timeout=60)
         response.raise_for_status()
         
         if debug:
@@ -904,6 +1758,56 @@ def upload_to_uguu(file_path: str, debug: bool = True) -> str:
             print(f"Error uploading to uguu.se: {str(e)}")
         raise e
 
+def build_adjustment_lut(histogram: List[int], brightness_factor: float = 1.0, contrast_factor: float = 1.0) -> List[int]:
+    """
+    Builds a 256-entry lookup table equal to ImageEnhance.Brightness followed by
+    ImageEnhance.Contrast on a grayscale image (same float32 arithmetic and truncation).
+    
+    Args:
+        histogram (List[int]): Histogram of the grayscale image, needed for the contrast mean
+        brightness_factor (float): Brightness factor, 1.0 is unchanged
+        contrast_factor (float): Contrast factor, 1.0 is unchanged
+        
+    Returns:
+        List[int]: Lookup table for Image.point
+    """
+    # Pillow blends in single precision; plain floats can differ by one level on some values
+    f32 = np.float32 if NUMPY_AVAILABLE else float
+    
+    lut = list(range(256))
+    if brightness_factor != 1.0:
+        factor = f32(brightness_factor)
+        lut = [min(255, max(0, int(f32(v) * factor))) for v in range(256)]
+    if contrast_factor != 1.0:
+        # ImageEnhance.Contrast blends towards the rounded mean of the brightened image
+        adjusted_histogram = [0] * 256
+        for value, count in enumerate(histogram[:256]):
+            adjusted_histogram[lut[value]] += count
+        total = sum(adjusted_histogram)
+        mean = f32(int(sum(v * n for v, n in enumerate(adjusted_histogram)) / total + 0.5) if total else 0)
+        factor = f32(contrast_factor)
+        contrast_lut = [min(255, max(0, int(mean + factor * (f32(v) - mean)))) for v in range(256)]
+        lut = [contrast_lut[v] for v in lut]
+    return lut
+
+def adjust_image_in_memory(img, brightness_factor: float = 1.0, contrast_factor: float = 1.0):
+    """
+    Converts an image to grayscale and applies brightness and contrast as one lookup-table pass.
+    
+    Args:
+        img: PIL Image
+        brightness_factor (float): Brightness factor, 1.0 is unchanged
+        contrast_factor (float): Contrast factor, 1.0 is unchanged
+        
+    Returns:
+        PIL Image in grayscale mode
+    """
+    img = img.convert('L')
+    if brightness_factor == 1.0 and contrast_factor == 1.0:
+        return img
+    histogram = img.histogram() if contrast_factor != 1.0 else []
+    return img.point(build_adjustment_lut(histogram, brightness_factor, contrast_factor))
+
 def adjust_image(image_path: str, brightness_factor: float = 1.0, contrast_factor: float = 1.0, output_path: str = None, debug: bool = True) -> str:
     """
     Converts image to grayscale and adjusts the brightness and contrast using Pillow.
@@ -925,28 +1829,11 @@ def adjust_image(image_path: str, brightness_factor: float = 1.0, contrast_facto
             print(f"Brightness factor: {brightness_factor}")
             print(f"Contrast factor: {contrast_factor}")
         
-        # Open the image
-        img = Image.open(image_path)
-        
-        # Convert to grayscale
-        img = img.convert('L')
+        # Open the image, convert to grayscale and adjust in a single pass
+        img = adjust_image_in_memory(Image.open(image_path), brightness_factor, contrast_factor)
         
         if debug:
-            print("Converted to grayscale")
-        
-        # Adjust brightness
-        if brightness_factor != 1.0:
-            enhancer = ImageEnhance.Brightness(img)
-            img = enhancer.enhance(brightness_factor)
-            if debug:
-                print(f"Adjusted brightness by factor {brightness_factor}")
-        
-        # Adjust contrast
-        if contrast_factor != 1.0:
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(contrast_factor)
-            if debug:
-                print(f"Adjusted contrast by factor {contrast_factor}")
+            print(f"Converted to grayscale, adjusted brightness by {brightness_factor} and contrast by {contrast_factor}")
         
         # Generate output path if not provided
         if output_path is None:
@@ -966,19 +1853,8 @@ def adjust_image(image_path: str, brightness_factor: float = 1.0, contrast_facto
             print(f"Error adjusting image: {str(e)}")
         raise e
 
-def find_white_lines(img, threshold=250, min_line_width=100, debug=True):
-    """
-    Find horizontal white lines in a grayscale image.
-    
-    Args:
-        img: PIL Image in grayscale mode
-        threshold (int): Brightness threshold (0-255) to consider a pixel as white
-        min_line_width (int): Minimum width of consecutive white pixels to consider as a line
-        debug (bool): If True, prints debug information
-        
-    Returns:
-        list: Y-coordinates where white lines are found
-    """
+def _find_white_lines_loop(img, threshold=250, min_line_width=100):
+    """Pixel-by-pixel reference implementation of find_white_lines"""
     width, height = img.size
     pixels = img.load()
     white_lines = []
@@ -999,11 +1875,164 @@ def find_white_lines(img, threshold=250, min_line_width=100, debug=True):
         if is_white_line and white_count >= min_line_width:
             white_lines.append(y)
     
+    return white_lines
+
+def _find_white_lines_numpy(img, threshold=250, min_line_width=100, rows_per_chunk=2048):
+    """
+    Vectorized find_white_lines with the same rule as the loop: a row is a line when every
+    non-white pixel is preceded by at least min_line_width white pixels (counted since the
+    previous non-white pixel) and the row ends in at least min_line_width white pixels.
+    """
+    pixels = np.asarray(img)
+    height, width = pixels.shape
+    if min_line_width <= 0:
+        return list(range(height))
+    if width < min_line_width:
+        return []
+    
+    # A non-white pixel in the first min_line_width columns cannot follow a long enough run,
+    # and the row must end in a long enough white run; this rules out most text rows cheaply
+    candidates = np.flatnonzero((pixels[:, :min_line_width] >= threshold).all(axis=1)
+                                & (pixels[:, width - min_line_width:] >= threshold).all(axis=1))
+    
+    white_lines = []
+    # Work in row chunks to bound the memory of the running sums on tall strips
+    for start in range(0, len(candidates), rows_per_chunk):
+        rows = candidates[start:start + rows_per_chunk]
+        white = pixels[rows] >= threshold
+        # white_before[:, x] = number of white pixels in columns [0, x)
+        white_before = np.zeros((len(rows), width + 1), dtype=np.int32)
+        np.cumsum(white, axis=1, out=white_before[:, 1:])
+        
+        # Every later non-white pixel needs the min_line_width pixels before it to be white
+        run_ok = (white_before[:, min_line_width:width] - white_before[:, :width - min_line_width]) == min_line_width
+        bad = (~white[:, min_line_width:] & ~run_ok).any(axis=1)
+        
+        white_lines.extend(rows[~bad].tolist())
+    return white_lines
+
+def find_white_lines(img, threshold=250, min_line_width=100, debug=True):
+    """
+    Find horizontal white lines in a grayscale image.
+    
+    Args:
+        img: PIL Image in grayscale mode
+        threshold (int): Brightness threshold (0-255) to consider a pixel as white
+        min_line_width (int): Minimum width of consecutive white pixels to consider as a line
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        list: Y-coordinates where white lines are found
+    """
+    if img.mode != 'L':
+        img = img.convert('L')
+    
+    if NUMPY_AVAILABLE:
+        white_lines = _find_white_lines_numpy(img, threshold, min_line_width)
+    else:
+        white_lines = _find_white_lines_loop(img, threshold, min_line_width)
+    
     if debug:
         print(f"Found {len(white_lines)} white lines at positions: {white_lines}")
     
     return white_lines
 
+def _synthetic_text_strip(width: int = 800, height: int = 6000, seed: int = 0):
+    """Grayscale image of dark 'text lines' with jagged edges separated by white gaps"""
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    y = int(rng.integers(5, 30))
+    while y < height:
+        line_height = int(rng.integers(15, 40))
+        block = pixels[y:y + line_height]
+        block[rng.random(block.shape) < 0.3] = rng.integers(0, 200, dtype=np.uint8)
+        # Leave a white margin of random width on the right, like a short last line
+        margin = int(rng.integers(0, width // 2))
+        if margin:
+            block[:, width - margin:] = 255
+        y += line_height + int(rng.integers(3, 25))
+    return Image.fromarray(pixels)
+
+def benchmark_find_white_lines(image_paths: List[str] = None, threshold: int = 250, min_line_width: int = 70,
+                               repeat: int = 3, debug: bool = True) -> dict:
+    """
+    Times the vectorized find_white_lines against the pixel loop on a synthetic strip and
+    on real strips (e.g. downloaded VIP chapter images), and checks they find the same lines.
+    
+    Args:
+        image_paths (List[str], optional): Real images to include
+        threshold (int): Brightness threshold passed to both implementations
+        min_line_width (int): Minimum white run passed to both implementations
+        repeat (int): Runs of the vectorized version per image (the loop runs once)
+        debug (bool): If True, prints the timings
+        
+    Returns:
+        dict: Per image name: {'size', 'loop_seconds', 'numpy_seconds', 'speedup', 'same_lines'}
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy is not available. Install with: pip install numpy")
+    
+    images = [('synthetic', _synthetic_text_strip())]
+    for path in image_paths or []:
+        images.append((os.path.basename(path), Image.open(path).convert('L')))
+    
+    results = {}
+    for name, img in images:
+        start = time.perf_counter()
+        loop_lines = _find_white_lines_loop(img, threshold, min_line_width)
+        loop_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(repeat):
+            numpy_lines = _find_white_lines_numpy(img, threshold, min_line_width)
+        numpy_seconds = (time.perf_counter() - start) / repeat
+        
+        results[name] = {
+            'size': img.size,
+            'loop_seconds': loop_seconds,
+            'numpy_seconds': numpy_seconds,
+            'speedup': loop_seconds / numpy_seconds if numpy_seconds else None,
+            'same_lines': loop_lines == numpy_lines
+        }
+        if debug:
+            print(f"⏱️  {name} {img.size[0]}x{img.size[1]}: loop {loop_seconds * 1000:.0f}ms, "
+                  f"numpy {numpy_seconds * 1000:.1f}ms ({results[name]['speedup']:.0f}x), "
+                  f"same lines: {results[name]['same_lines']}")
+    return results
+
+def split_boxes(height: int, white_lines: List[int], min_height: int = 100, max_height: int = 800) -> List[tuple]:
+    """
+    Decides where to cut an image given its white lines. Sections shorter than min_height
+    are merged into the following one; sections taller than max_height are cut every max_height.
+    
+    Args:
+        height (int): Image height
+        white_lines (List[int]): Rows found by find_white_lines
+        min_height (int): Minimum height for a split section
+        max_height (int): Maximum height for a split section
+        
+    Returns:
+        List[tuple]: (top, bottom) row ranges, top to bottom
+    """
+    boxes = []
+    current_y = 0
+    for next_y in white_lines + [height]:
+        section_height = next_y - current_y
+        
+        # Skip if section is too small
+        if section_height < min_height:
+            continue
+        
+        # If section is too large, force split at max_height
+        if section_height > max_height:
+            for split_start in range(current_y, next_y, max_height):
+                boxes.append((split_start, min(split_start + max_height, next_y)))
+        else:
+            boxes.append((current_y, next_y))
+        
+        current_y = next_y
+    return boxes
+
 def split_image_at_whitespace(image_path: str, min_height: int = 100, max_height: int = 800, threshold: int = 250, min_line_width: int = 70, output_dir: str = None, debug: bool = True) -> list:
     """
     Splits an image at horizontal white lines, ensuring each part is within size constraints.
@@ -1065,45 +2094,15 @@ def split_image_at_whitespace(image_path: str, min_height: int = 100, max_height
         
         # Split image at white lines
         split_files = []
-        current_y = 0
-        part_num = 1
-        
-        for next_y in white_lines + [height]:
-            section_height = next_y - current_y
-            
-            # Skip if section is too small
-            if section_height < min_height:
-                continue
-                
-            # If section is too large, force split at max_height
-            if section_height > max_height:
-                splits = range(current_y, next_y, max_height)
-                for split_start in splits:
-                    split_end = min(split_start + max_height, next_y)
-                    
-                    # Create the cropped image
-                    cropped = img.crop((0, split_start, width, split_end))
-                    output_path = os.path.join(output_dir, f"{base_name}_part{part_num}.png")
-                    cropped.save(output_path, quality=95)
-                    split_files.append(output_path)
-                    
-                    if debug:
-                        print(f"Saved part {part_num} ({split_end-split_start}px) to: {output_path}")
-                    
-                    part_num += 1
-            else:
-                # Create the cropped image
-                cropped = img.crop((0, current_y, width, next_y))
-                output_path = os.path.join(output_dir, f"{base_name}_part{part_num}.png")
-                cropped.save(output_path, quality=95)
-                split_files.append(output_path)
-                
-                if debug:
-                    print(f"Saved part {part_num} ({section_height}px) to: {output_path}")
-                
-                part_num += 1
+        for part_num, (top, bottom) in enumerate(split_boxes(height, white_lines, min_height, max_height), start=1):
+            # Create the cropped image
+            cropped = img.crop((0, top, width, bottom))
+            output_path = os.path.join(output_dir, f"{base_name}_part{part_num}.png")
+            cropped.save(output_path, quality=95)
+            split_files.append(output_path)
             
-            current_y = next_y
+            if debug:
+                print(f"Saved part {part_num} ({bottom - top}px) to: {output_path}")
         
         if debug:
             print(f"Split into {len(split_files)} parts")
@@ -1154,9 +2153,172 @@ def filter_response(response_text: str, debug: bool = True) -> str:
     
     return '\n'.join(filtered_lines)
 
-def analyze_image(image_path: str, prompt: str = "What text do you see in this image?", brightness: float = None, contrast: float = None, split: bool = False, min_height: int = 30, max_height: int = 800, debug: bool = True) -> str:
+# OpenAI clients are created once and reused so their connection pools stay warm
+_openai_clients = {}
+_async_openai_clients = weakref.WeakKeyDictionary()
+_openai_lock = threading.Lock()
+
+def get_openai_client(api_key: str = None, base_url: str = None) -> OpenAI:
+    """
+    Returns the shared OpenAI client, creating it on first use.
+    
+    Args:
+        api_key (str, optional): API key (default: OPENAI_API_KEY)
+        base_url (str, optional): API base URL (default: OPENAI_BASE_URL or the OpenAI API)
+        
+    Returns:
+        OpenAI: Client whose HTTP connection pool is reused across calls
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    with _openai_lock:
+        client = _openai_clients.get((api_key, base_url))
+        if client is None:
+            # No SDK retries: ocr_image_parts retries each part itself, paced by rate_controller
+            client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            _openai_clients[(api_key, base_url)] = client
+    return client
+
+def get_async_openai_client(api_key: str = None, base_url: str = None) -> AsyncOpenAI:
+    """
+    Returns the shared AsyncOpenAI client for the running event loop. Async connections
+    belong to the loop that opened them, so each loop gets its own client.
+    
+    Args:
+        api_key (str, optional): API key (default: OPENAI_API_KEY)
+        base_url (str, optional): API base URL (default: OPENAI_BASE_URL or the OpenAI API)
+        
+    Returns:
+        AsyncOpenAI: Client for the current event loop
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    loop = asyncio.get_running_loop()
+    with _openai_lock:
+        clients = _async_openai_clients.setdefault(loop, {})
+        client = clients.get((api_key, base_url))
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+            clients[(api_key, base_url)] = client
+    return client
+
+def _image_part_url(image_path: str, image_mode: str, debug: bool = True) -> str:
+    """URL the vision model reads an image from: an inline data URL, or an uguu.se upload"""
+    if image_mode == "inline":
+        return image_data_url(image_path)
+    if image_mode == "upload":
+        return upload_to_uguu(image_path, debug)
+    raise ValueError(f"Unknown image_mode: {image_mode} (expected 'inline' or 'upload')")
+
+def _ocr_image_part(client, image_url: str, prompt: str, model: str = "gpt-4o") -> str:
+    """
+    Sends one image to the vision model.
+    
+    Args:
+        client: OpenAI client
+        image_url (str): Public URL or data URL of the image
+        prompt (str): The prompt to send with the image
+        model (str): Vision model name
+        
+    Returns:
+        str: The model's raw answer
+    """
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url
+                        }
+                    }
+                ]
+            }
+        ],
+        temperature=0.3
+    )
+    return response.choices[0].message.content
+
+def ocr_image_parts(client, part_urls: List[str], prompt: str, max_workers: int = 4, max_retries: int = 2,
+                    part_results: dict = None, part_keys: List[str] = None, debug: bool = True) -> List[str]:
+    """
+    Sends image parts to the vision model concurrently, paced by the shared rate controller,
+    retrying only the parts that fail.
+    
+    Args:
+        client: OpenAI client
+        part_urls (List[str]): Data URLs or public URLs of the parts, in strip order
+        prompt (str): The prompt to send with each part
+        max_workers (int): Parts in flight at once
+        max_retries (int): Retries per part
+        part_results (dict, optional): Results of earlier attempts by part key; parts found here
+                                       are not sent again and new results are added
+        part_keys (List[str], optional): Key of each part in part_results (e.g. a hash of its bytes)
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        List[str]: One answer per part, in the order of part_urls
+    """
+    limiter_url = str(client.base_url)
+    
+    def run(index):
+        key = part_keys[index] if part_keys else None
+        if part_results is not None and key in part_results:
+            return part_results[key]
+        
+        for attempt in range(max_retries + 1):
+            rate_controller.wait(limiter_url)
+            request_start = time.time()
+            try:
+                text = _ocr_image_part(client, part_urls[index], prompt)
+            except Exception as e:
+                status_code = getattr(e, 'status_code', None)
+                # 429s carry the server's requested delay, which the next wait() honors
+                rate_controller.record(limiter_url, status_code, time.time() - request_start, error=status_code is None,
+                                       retry_after=_retry_after_seconds(getattr(e, 'response', None)))
+                if attempt == max_retries:
+                    raise
+                if debug:
+                    print(f"⚠️  Part {index + 1} failed ({str(e)}), retrying...")
+                continue
+            
+            rate_controller.record(limiter_url, 200, time.time() - request_start)
+            if part_results is not None and key is not None:
+                part_results[key] = text
+            return text
+    
+    results = [None] * len(part_urls)
+    failures = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(part_urls)))) as executor:
+        futures = {executor.submit(run, index): index for index in range(len(part_urls))}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                failures.append((index, e))
+    
+    if failures:
+        index, error = min(failures, key=lambda failure: failure[0])
+        raise Exception(f"OCR failed for {len(failures)} of {len(part_urls)} parts (part {index + 1}: {str(error)})")
+    
+    if debug:
+        print(f"✅ OCR of {len(part_urls)} parts complete")
+    return results
+
+def _is_blank_part(part, threshold: int = 250) -> bool:
+    """True if every pixel of a grayscale part (array or PIL image) is at least threshold"""
+    if NUMPY_AVAILABLE and isinstance(part, np.ndarray):
+        return part.size == 0 or int(part.min()) >= threshold
+    return part.getextrema()[0] >= threshold
+
+def analyze_image(image_path: str, prompt: str = "What text do you see in this image?", brightness: float = None, contrast: float = None, split: bool = False, min_height: int = 30, max_height: int = 800, image_mode: str = "inline", base_url: str = None, debug: bool = True) -> str:
     """
-    Sends an image to GPT-4o for analysis using uguu.se as intermediary.
+    Sends an image to GPT-4o for analysis, inline as a data URL or using uguu.se as intermediary.
     Can optionally adjust image brightness/contrast and split at white lines.
     
     Args:
@@ -1167,14 +2329,17 @@ def analyze_image(image_path: str, prompt: str = "What text do you see in this i
         split (bool): Whether to split the image at white lines before analysis
         min_height (int): Minimum height for split sections (if split=True)
         max_height (int): Maximum height for split sections (if split=True)
+        image_mode (str): "inline" sends images as base64 data URLs in the request,
+                          "upload" uploads them to uguu.se and sends the public URL
+        base_url (str, optional): OpenAI-compatible API base URL, e.g. a local stand-in server
         debug (bool): If True, prints debug information
         
     Returns:
         str: The response from GPT-4o
     """
     try:
-        # Initialize the OpenAI client
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Reuse the shared OpenAI client
+        client = get_openai_client(base_url=base_url)
         
         if debug:
             print(f"\n=== Analyzing Image ===")
@@ -1185,6 +2350,13 @@ def analyze_image(image_path: str, prompt: str = "What text do you see in this i
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image file not found: {image_path}")
         
+        # Inline images never need files on disk: run the in-memory pipeline
+        if image_mode == "inline":
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+            return analyze_image_bytes(image_bytes, prompt, brightness, contrast, split, min_height, max_height,
+                                       base_url=base_url, debug=debug)
+        
         # Adjust image if requested
         if brightness is not None or contrast is not None:
             image_path = adjust_image(
@@ -1203,39 +2375,22 @@ def analyze_image(image_path: str, prompt: str = "What text do you see in this i
                 debug=debug
             )
             
-            # Analyze each part
-            responses = []
+            # Skip blank strips, then analyze the remaining parts concurrently
+            part_urls = []
             for part_path in image_parts:
-                # Upload to uguu.se to get a public URL
-                public_url = upload_to_uguu(part_path, debug)
-                
-                if debug:
-                    print(f"Image part uploaded to: {public_url}")
+                with Image.open(part_path) as part:
+                    if _is_blank_part(part.convert('L')):
+                        continue
+                part_url = _image_part_url(part_path, image_mode, debug)
                 
-                # Create the payload for the API
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": prompt},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": public_url
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    temperature=0.3
-                )
-                responses.append(response.choices[0].message.content)
+                if debug and image_mode == "upload":
+                    print(f"Image part uploaded to: {part_url}")
+                part_urls.append(part_url)
+            
+            responses = ocr_image_parts(client, part_urls, prompt, debug=debug)
             
             # Combine responses and filter
-            # small optimization, last response is usually empty
-            combined_response = "\n\n".join(responses[:-1])
+            combined_response = "\n\n".join(responses)
             filtered_response = filter_response(combined_response, debug)
             
             if debug:
@@ -1246,32 +2401,13 @@ def analyze_image(image_path: str, prompt: str = "What text do you see in this i
             
         else:
             # Process single image as before
-            public_url = upload_to_uguu(image_path, debug)
-            
-            if debug:
-                print(f"Image uploaded to: {public_url}")
+            image_url = _image_part_url(image_path, image_mode, debug)
             
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": public_url
-                                }
-                            }
-                        ]
-                    }
-                ],
-                temperature=0.3
-            )
+            if debug and image_mode == "upload":
+                print(f"Image uploaded to: {image_url}")
             
-            # Filter the response
-            filtered_response = filter_response(response.choices[0].message.content, debug)
+            # Filter the response (ocr_image_parts supplies the retries the client no longer does)
+            filtered_response = filter_response(ocr_image_parts(client, [image_url], prompt, debug=debug)[0], debug)
             
             if debug:
                 print("Analysis complete!")
@@ -1284,6 +2420,106 @@ def analyze_image(image_path: str, prompt: str = "What text do you see in this i
             print(f"Error analyzing image: {str(e)}")
         raise e
 
+def encode_png(image) -> bytes:
+    """Encodes a PIL image or a grayscale array (e.g. a row slice of the page) as PNG bytes"""
+    if NUMPY_AVAILABLE and isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def analyze_image_bytes(image_bytes: bytes, prompt: str = "What text do you see in this image?", brightness: float = None, contrast: float = None, split: bool = False, min_height: int = 30, max_height: int = 800, threshold: int = 250, min_line_width: int = 70, base_url: str = None, max_workers: int = 4, part_results: dict = None, timings: dict = None, debug: bool = True) -> str:
+    """
+    Runs the OCR pipeline on an image held in memory: decode, grayscale plus brightness/contrast
+    as one lookup-table pass, optional split at white lines into row slices, one PNG encode per
+    non-blank part, and concurrent inline submission to GPT-4o. No temporary files are written.
+    Without brightness, contrast or split the image is sent unchanged, in colour.
+    
+    Args:
+        image_bytes (bytes): Encoded image (PNG, JPEG, ...)
+        prompt (str): The prompt to send to GPT-4o
+        brightness (float, optional): Brightness adjustment factor. >1 is brighter, <1 is darker
+        contrast (float, optional): Contrast adjustment factor. >1 is more contrast, <1 is less
+        split (bool): Whether to split the image at white lines before analysis
+        min_height (int): Minimum height for split sections (if split=True)
+        max_height (int): Maximum height for split sections (if split=True)
+        threshold (int): Brightness threshold for white lines (if split=True)
+        min_line_width (int): Minimum white run for white lines (if split=True)
+        base_url (str, optional): OpenAI-compatible API base URL
+        max_workers (int): Parts sent to the model at once
+        part_results (dict, optional): OCR results by part hash; pass the same dict when retrying
+                                       an image so only parts that failed before are sent again
+        timings (dict, optional): Filled with seconds per stage (decode, adjust, split, encode, ocr, total)
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        str: The filtered response from GPT-4o
+    """
+    timings = timings if timings is not None else {}
+    pipeline_start = stage_start = time.perf_counter()
+    
+    def stage(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + now - stage_start
+        stage_start = now
+    
+    client = get_openai_client(base_url=base_url)
+    
+    img = Image.open(io.BytesIO(image_bytes))
+    img.load()
+    stage('decode')
+    
+    # Grayscale only serves the adjustment and the white-line search; otherwise the
+    # model gets the image in its original colours
+    adjusted = brightness is not None or contrast is not None or split
+    if adjusted:
+        img = adjust_image_in_memory(img,
+                                     brightness if brightness is not None else 1.0,
+                                     contrast if contrast is not None else 1.0)
+    stage('adjust')
+    
+    if split:
+        width, height = img.size
+        boxes = split_boxes(height, find_white_lines(img, threshold, min_line_width, debug), min_height, max_height)
+        if NUMPY_AVAILABLE:
+            # Row slices of the page array are views, not copies
+            pixels = np.asarray(img)
+            parts = [pixels[top:bottom] for top, bottom in boxes]
+        else:
+            parts = [img.crop((0, top, width, bottom)) for top, bottom in boxes]
+        # Blank strips have no text to read
+        parts = [part for part in parts if not _is_blank_part(part, threshold)]
+    else:
+        parts = [img]
+    stage('split')
+    
+    if not adjusted and any(image_bytes.startswith(signature) for signature, _ in IMAGE_SIGNATURES):
+        # Untouched image in a format the API accepts: send the original bytes
+        encoded_parts = [image_bytes]
+    else:
+        encoded_parts = [encode_png(part) for part in parts]
+    part_keys = [hashlib.sha256(encoded).hexdigest() for encoded in encoded_parts]
+    part_urls = [image_data_url(encoded) for encoded in encoded_parts]
+    stage('encode')
+    
+    if debug:
+        print(f"\n=== Analyzing Image ({len(part_urls)} part(s)) ===")
+    
+    responses = ocr_image_parts(client, part_urls, prompt, max_workers=max_workers,
+                                part_results=part_results, part_keys=part_keys, debug=debug)
+    stage('ocr')
+    
+    combined_response = "\n\n".join(responses)
+    filtered_response = filter_response(combined_response, debug)
+    timings['total'] = time.perf_counter() - pipeline_start
+    
+    if debug:
+        print("⏱️  " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+        print("=== End Analysis ===\n")
+    
+    return filtered_response
+
 def analyze_image_from_url(url: str, div_id: str = None, prompt: str = "What text do you see in this image?", debug: bool = True) -> str:
     """
     Downloads an image from a URL and sends it to GPT-4 Vision for analysis.
@@ -1298,10 +2534,6 @@ def analyze_image_from_url(url: str, div_id: str = None, prompt: str = "What tex
         str: The response from GPT-4 Vision
     """
     try:
-        temp_dir = "temp_images"
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_image_path = os.path.join(temp_dir, "temp_image.jpg")
-        
         if div_id:
             # If div_id is provided, try to find image in that div
             image_url = fetch_image_url(url, div_id, debug)
@@ -1311,19 +2543,13 @@ def analyze_image_from_url(url: str, div_id: str = None, prompt: str = "What tex
             # If no div_id, assume url is direct image link
             image_url = url
         
-        # Download the image
-        success = download_image(image_url, temp_image_path, debug)
-        if not success:
+        # Download the image into memory
+        image_bytes = download_image_bytes(image_url, debug)
+        if image_bytes is None:
             raise Exception("Failed to download image")
         
         # Analyze the image
-        result = analyze_image(temp_image_path, prompt, debug)
-        
-        # Clean up
-        if os.path.exists(temp_image_path):
-            os.remove(temp_image_path)
-        
-        return result
+        return analyze_image_bytes(image_bytes, prompt, debug=debug)
         
     except Exception as e:
         if debug:
@@ -1378,17 +2604,20 @@ def fetch_main_content(url: str, main_id: str = None, main_class: str = None, de
                     print("All strategies failed for persistent 202 responses")
                 return None
         
+        # Decode the body once with the declared charset
+        html = response_html(response)
+        
         if debug:
             print("\n=== Debug Information ===")
             print(f"Response Status Code: {response.status_code}")
             print(f"Response Headers: {dict(response.headers)}")
             print(f"Current Cookies: {dict(session.cookies)}")
             print("\nFirst 500 characters of response content:")
-            print(response.text[:500])
+            print(html[:500])
             print("\n=== End Debug Info ===\n")
         
         # Check if we got a captcha challenge
-        if response.status_code == 202 or 'captcha' in response.text.lower():
+        if response.status_code == 202 or 'captcha' in html.lower():
             if debug:
                 print("WARNING: Captcha challenge detected. You may need to:")
                 print("1. Wait a few minutes before trying again")
@@ -1396,8 +2625,8 @@ def fetch_main_content(url: str, main_id: str = None, main_class: str = None, de
                 print("3. Solve the captcha manually in a browser")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse only the target main element(s) unless debugging the page structure
+        soup = parse_html(html, 'main', main_id, main_class, full=debug)
         
         def process_main_content(main_element):
             """Helper function to process main content consistently"""
@@ -1629,9 +2858,6 @@ def handle_waf_response(response, session, debug: bool = True) -> bool:
                             if duplicate_count > 1:
                                 print(f"  WARNING: Found {duplicate_count} cookies with name '{cookie_name}'")
                         
-                        # Also update the session manager's cookies
-                        session_manager.save_cookies()
-                        
                 except Exception as e:
                     if debug:
                         print(f"Error processing cookie header '{cookie_header}': {str(e)}")
@@ -1639,6 +2865,9 @@ def handle_waf_response(response, session, debug: bool = True) -> bool:
         # Clean up any duplicate cookies after processing all Set-Cookie headers
         cleanup_duplicate_cookies(session, debug)
         
+        # Update the session manager's cookies once for the whole response
+        session_manager.save_cookies()
+        
         # After processing cookies, check if we should retry the request
         if debug:
             print("202 response processed - will retry request with new cookies")
@@ -1775,9 +3004,6 @@ def handle_202_response_flow(session, url: str, response, debug: bool = True):
                     if debug:
                         print(f"Set cookie: {cookie_name} = {cookie_value}")
                     
-                    # Update session manager
-                    session_manager.save_cookies()
-                    
             except Exception as e:
                 if debug:
                     print(f"Error processing cookie: {str(e)}")
@@ -1785,19 +3011,22 @@ def handle_202_response_flow(session, url: str, response, debug: bool = True):
     # Clean up duplicate cookies
     cleanup_duplicate_cookies(session, debug)
     
-    # Step 2: Wait for server processing (202 means "Accepted" - server is processing)
-    wait_time = 5  # Wait 5 seconds for server to process
+    # Update session manager once for the whole response
+    session_manager.save_cookies()
+    
+    # Step 2: Wait for server processing (202 means "Accepted" - server is processing);
+    # the 202 has already slowed this host's rate down
     if debug:
-        print(f"Step 2: Waiting {wait_time} seconds for server processing...")
-    time.sleep(wait_time)
+        print("Step 2: Waiting for server processing...")
+    rate_controller.wait(url, debug=debug)
     
     # Step 3: Make follow-up request with the same URL but updated cookies
     if debug:
         print("Step 3: Making follow-up request with processed cookies")
         print(f"Current cookies: {dict(session.cookies)}")
     
-    # Create headers for follow-up request
-    follow_up_headers = create_realistic_browser_headers(url, debug=debug)
+    # Follow up as the same browser that received the 202
+    follow_up_headers = get_header_profile(url, debug=debug)
     
     # Add headers that indicate this is a follow-up request
     follow_up_headers.update({
@@ -1812,7 +3041,10 @@ def handle_202_response_flow(session, url: str, response, debug: bool = True):
             print(f"  {key}: {value}")
     
     try:
+        request_start = time.time()
         follow_up_response = session.get(url, headers=follow_up_headers, timeout=30)
+        rate_controller.record(url, follow_up_response.status_code, time.time() - request_start,
+                               retry_after=_retry_after_seconds(follow_up_response))
         
         if debug:
             print(f"Follow-up response status: {follow_up_response.status_code}")
@@ -1824,7 +3056,7 @@ def handle_202_response_flow(session, url: str, response, debug: bool = True):
             print(f"Error in follow-up request: {str(e)}")
         return response  # Return original 202 response if follow-up fails
 
-def make_request_with_retry(session, url: str, headers: dict, max_retries: int = 3, debug: bool = True):
+def make_request_with_retry(session, url: str, headers: dict, max_retries: int = 3, debug: bool = True, use_cache: bool = True):
     """
     Makes an HTTP request with retry logic and WAF handling.
     
@@ -1834,10 +3066,21 @@ def make_request_with_retry(session, url: str, headers: dict, max_retries: int =
         headers (dict): Request headers
         max_retries (int): Maximum number of retries
         debug (bool): If True, prints debug information
+        use_cache (bool): If True, serve or revalidate the page through response_cache
         
     Returns:
         requests.Response: The HTTP response
     """
+    if use_cache:
+        return response_cache.fetch(
+            url, session.cookies,
+            lambda conditional: _make_request_with_retry(session, url, headers, max_retries, debug, conditional),
+            debug=debug)
+    return _make_request_with_retry(session, url, headers, max_retries, debug)
+
+def _make_request_with_retry(session, url: str, headers: dict, max_retries: int = 3, debug: bool = True,
+                             conditional_headers: dict = None):
+    """Retry loop behind make_request_with_retry; conditional_headers revalidate a cached copy"""
     for attempt in range(max_retries):
         if debug:
             print(f"\n=== Request Attempt {attempt + 1}/{max_retries} ===")
@@ -1845,29 +3088,31 @@ def make_request_with_retry(session, url: str, headers: dict, max_retries: int =
             print(f"Current cookies: {dict(session.cookies)}")
         
         try:
-            # Add progressive delay between requests
-            if attempt == 0:
-                delay = 3  # First attempt: 3 seconds
-            else:
-                delay = 5 + (attempt * 3)  # Progressive delay: 8, 11, 14 seconds
+            # Pace requests by how the host has been responding
+            rate_controller.wait(url, debug=debug)
             
-            if debug:
-                print(f"Waiting {delay} seconds before request...")
-            time.sleep(delay)
-            
-            # Add some randomization to headers to appear more human-like
-            current_headers = create_realistic_browser_headers(url, debug=debug)
+            # Reuse the host's header profile so every request looks like the same browser
+            current_headers = get_header_profile(url, debug=debug)
+            current_headers.update(conditional_headers or {})
             
             if debug:
                 print("Request Headers:")
                 for key, value in current_headers.items():
                     print(f"  {key}: {value}")
             
+            request_start = time.time()
             response = session.get(url, headers=current_headers, timeout=25)
+            latency = time.time() - request_start
             
             if debug:
                 print(f"Response Status: {response.status_code}")
             
+            # Classify before recording, so a challenge page counts once, as throttled
+            # (202s go through handle_202_response_flow and are throttled by status)
+            challenge = response.status_code != 202 and not handle_waf_response(response, session, debug)
+            rate_controller.record(url, response.status_code, latency, throttled=True if challenge else None,
+                                   retry_after=_retry_after_seconds(response))
+            
             # Handle 202 responses properly
             if response.status_code == 202:
                 if debug:
@@ -1891,16 +3136,17 @@ def make_request_with_retry(session, url: str, headers: dict, max_retries: int =
                         print(f"Follow-up returned status {follow_up_response.status_code}")
                     return follow_up_response
             
-            # Check if this is a WAF response that needs handling
-            should_retry = handle_waf_response(response, session, debug)
-            
-            if not should_retry:
+            # A WAF/captcha challenge: stop retrying and come back as a different browser
+            if challenge:
                 if debug:
                     print("WAF/Captcha challenge detected. Stopping retries.")
+                # Keeps the challenge page out of response_cache
+                response.waf_challenge = True
+                rotate_header_profile(url, debug=debug)
                 return response
             
-            # If we get here, response looks normal
-            if response.status_code == 200:
+            # If we get here, response looks normal (304: the cached copy is still current)
+            if response.status_code in (200, 304):
                 if debug:
                     print("Successful response received")
                 return response
@@ -1915,6 +3161,7 @@ def make_request_with_retry(session, url: str, headers: dict, max_retries: int =
                     return response
                 
         except requests.RequestException as e:
+            rate_controller.record(url, error=True)
             if debug:
                 print(f"Request error on attempt {attempt + 1}: {str(e)}")
             
@@ -1961,10 +3208,8 @@ def handle_persistent_202(url: str, headers: dict, max_attempts: int = 3, debug:
                 print("Strategy 2: Using different browser fingerprint")
             session = session_manager.get_session()
             
-            # Create headers with different browser characteristics
-            modified_headers = create_realistic_browser_headers(url, debug=debug)
-            # Force different Chrome version
-            modified_headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+            # Rotate to a new profile with a different Chrome version
+            modified_headers = rotate_header_profile(url, debug=debug)
             
             response = session.get(url, headers=modified_headers, timeout=30)
             
@@ -1974,25 +3219,8 @@ def handle_persistent_202(url: str, headers: dict, max_attempts: int = 3, debug:
                 print("Strategy 3: Using Firefox simulation")
             session = session_manager.get_session()
             
-            # Create Firefox-like headers
-            firefox_headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:139.0) Gecko/20100101 Firefox/139.0',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br, zstd',
-                'DNT': '1',
-                'Sec-GPC': '1',
-                'Connection': 'keep-alive',
-                #'Cookie': 'newstatisticUUID=1750629686_1426193254; _csrfToken=7kpnjFL4O5V5G9xTMNU8YjzWxokwpvpDXz5WUFD6; fu=1116195350; supportWebp=false; _ga_FZMMH98S83=GS2.1.s1750629687$o1$g1$t1750631423$j53$l0$h0; _ga=GA1.1.914561028.1750629687; _ga_PFYW0QLV3P=GS2.1.s1750629687$o1$g1$t1750631423$j53$l0$h0; traffic_utm_referer=; se_ref=; w_tsfp=ltvuV0MF2utBvS0Q7Krvl0qnEz8gdDw4h0wpEaR0f5thQLErU5mA0YB5v8LxM3TW5sxnvd7DsZoyJTLYCJI3dwMSTMjFIIgWjFiYw4kh2N0QU0QzGZrUD1ZLcb0nujZFfnhCNxS00jA8eIUd379yilkMsyN1zap3TO14fstJ019E6KDQmI5uDW3HlFWQRzaLbjcMcuqPr6g18L5a5Wne4QnyKlN0V7sTgkzH0y8cXyty6EC4d+BYN0mrdcetSqA=',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'same-origin',
-                'Sec-Fetch-User': '?1',
-                'Priority': 'u=0, i',
-                'Pragma': 'no-cache',
-                'Cache-Control': 'no-cache',
-            }
+            # Firefox profile for this host
+            firefox_headers = get_header_profile(url, 'firefox', debug=debug)
             
             response = session.get(url, headers=firefox_headers, timeout=30)
         
@@ -2231,7 +3459,7 @@ def simulate_browser_navigation(url: str, debug: bool = True):
     if debug:
         print(f"Step 2: Visiting target URL with referer: {search_url}")
     
-    target_headers = create_realistic_browser_headers(url, referer=search_url, debug=debug)
+    target_headers = get_header_profile(url, referer=search_url, debug=debug)
     
     # Add some randomization to timing
     time.sleep(random.uniform(0.5, 2.0))
@@ -2293,6 +3521,91 @@ def create_firefox_headers(url: str, cookies: dict = None, debug: bool = True) -
     
     return firefox_headers
 
+# Header profiles built once per (host, browser) and reused for every request to that host,
+# so a host sees one consistent browser on its keep-alive connections
+HEADER_PROFILES: Dict[tuple, dict] = {}
+# Headers that describe a single navigation rather than the browser; never stored in a profile
+PER_REQUEST_HEADERS = ('Referer', 'Host', 'Sec-Fetch-Site')
+# Last page requested per host and the Referer it was sent with, for same-site referers
+LAST_PAGES: Dict[str, tuple] = {}
+_header_profiles_lock = threading.Lock()
+
+def get_header_profile(url: str, browser: str = 'chrome', referer: str = None, debug: bool = True) -> dict:
+    """
+    Returns the header profile for the URL's host, building it on first use.
+    
+    The cached profile only holds browser-level headers. Each call adds the navigation
+    headers for this request: the Referer is the previous page requested on the same
+    host (or `referer` if given, or none for the first page), and Firefox profiles get
+    the Host of this URL.
+    
+    Args:
+        url (str): The target URL
+        browser (str): 'chrome' (create_realistic_browser_headers) or 'firefox' (create_firefox_headers)
+        referer (str, optional): Page this request navigates from, overriding the same-site default
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        dict: A copy of the host's headers, safe for per-request changes
+    """
+    host = urlparse(url).netloc
+    key = (host, browser)
+    with _header_profiles_lock:
+        profile = HEADER_PROFILES.get(key)
+        if profile is None:
+            builder = create_firefox_headers if browser == 'firefox' else create_realistic_browser_headers
+            profile = {name: value for name, value in builder(url, debug=debug).items()
+                       if name not in PER_REQUEST_HEADERS}
+            HEADER_PROFILES[key] = profile
+            if debug:
+                print(f"🔍 Built {browser} header profile for {host}")
+        
+        if referer is None:
+            last_url, last_referer = LAST_PAGES.get(host, (None, None))
+            # Retrying the same page keeps the referer it was first requested with
+            referer = last_referer if last_url == url else last_url
+        LAST_PAGES[host] = (url, referer)
+    
+    headers = dict(profile)
+    if browser == 'firefox':
+        headers['Host'] = host
+    if referer:
+        headers['Referer'] = referer
+        headers['Sec-Fetch-Site'] = 'same-origin' if urlparse(referer).netloc == host else 'cross-site'
+    else:
+        headers['Sec-Fetch-Site'] = 'none'
+    return headers
+
+def rotate_header_profile(url: str, browser: str = 'chrome', debug: bool = True) -> dict:
+    """
+    Replaces the URL host's header profile, e.g. after the host starts answering with
+    WAF challenges. The new Chrome profile always differs in User-Agent. The shared
+    session is left open, since other hosts' requests may still be using it.
+    
+    Args:
+        url (str): The target URL
+        browser (str): Profile to rotate ('chrome' or 'firefox')
+        debug (bool): If True, prints debug information
+        
+    Returns:
+        dict: A copy of the new profile, with this request's navigation headers
+    """
+    key = (urlparse(url).netloc, browser)
+    with _header_profiles_lock:
+        old_profile = HEADER_PROFILES.pop(key, None)
+    
+    new_profile = get_header_profile(url, browser, debug=debug)
+    for _ in range(5):
+        if browser == 'firefox' or old_profile is None or new_profile['User-Agent'] != old_profile['User-Agent']:
+            break
+        with _header_profiles_lock:
+            HEADER_PROFILES.pop(key, None)
+        new_profile = get_header_profile(url, browser, debug=False)
+    
+    if debug:
+        print(f"♻️  Rotated {browser} header profile for {key[0]}: {new_profile['User-Agent']}")
+    return new_profile
+
 def fetch_with_firefox_headers(url: str, div_id: str = None, div_class: str = None, debug: bool = True) -> Optional[Union[str, List[str]]]:
     """
     Fetches content using Firefox headers that match the working pattern.
@@ -2329,7 +3642,7 @@ def fetch_with_firefox_headers(url: str, div_id: str = None, div_class: str = No
         session = session_manager.get_session()
         
         # Create Firefox headers
-        firefox_headers = create_firefox_headers(url, debug=debug)
+        firefox_headers = get_header_profile(url, 'firefox', debug=debug)
         
         if debug:
             print(f"Current cookies: {dict(session.cookies)}")
@@ -2351,8 +3664,9 @@ def fetch_with_firefox_headers(url: str, div_id: str = None, div_class: str = No
                 print(f"❌ Firefox headers request failed: {response.status_code}")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Decode once and parse only the target div(s) unless debugging the page structure
+        html = response_html(response)
+        soup = parse_html(html, 'div', div_id, div_class, full=debug)
         
         def process_div_content(div_element):
             """Helper function to process div content consistently"""
@@ -2493,8 +3807,9 @@ def fetch_with_confirmed_headers(url: str, main_id: str = None, main_class: str
                 print(f"❌ Confirmed headers request failed: {response.status_code}")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Decode once and parse only the target main element(s) unless debugging the page structure
+        html = response_html(response)
+        soup = parse_html(html, 'main', main_id, main_class, full=debug)
         
         def process_main_content(main_element):
             """Helper function to process main content consistently"""
@@ -2694,8 +4009,9 @@ def fetch_h1_with_confirmed_headers(url: str, h1_id: str = None, h1_class: str =
                 print(f"❌ Confirmed headers request failed: {response.status_code}")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Decode once and parse only the target h1(s) unless debugging the page structure
+        html = response_html(response)
+        soup = parse_html(html, 'h1', h1_id, h1_class, full=debug)
         
         def process_h1_content(h1_element):
             """Helper function to process h1 content consistently"""
@@ -2824,7 +4140,7 @@ def fetch_h1_with_confirmed_headers(url: str, h1_id: str = None, h1_class: str =
     except Exception as e:
         raise Exception(f"Error processing webpage: {str(e)}")
 
-def make_request_with_connection_retry(session, url: str, headers: dict, max_retries: int = 5, debug: bool = True):
+def make_request_with_connection_retry(session, url: str, headers: dict, max_retries: int = 5, debug: bool = True, use_cache: bool = True):
     """
     Makes an HTTP request with enhanced retry logic specifically for connection errors.
     Handles 'Connection aborted', 'RemoteDisconnected', and other connection-related issues.
@@ -2835,10 +4151,18 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
         headers (dict): Request headers
         max_retries (int): Maximum number of retries
         debug (bool): If True, prints debug information
+        use_cache (bool): If True, serve or revalidate the page through response_cache
         
     Returns:
         requests.Response: The HTTP response
     """
+    if use_cache:
+        return response_cache.fetch(
+            url, session.cookies,
+            lambda conditional: make_request_with_connection_retry(
+                session, url, {**headers, **conditional}, max_retries, debug, use_cache=False),
+            debug=debug)
+    
     import socket
     from urllib3.exceptions import ProtocolError, MaxRetryError
     
@@ -2860,15 +4184,8 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
             print(f"URL: {url}")
         
         try:
-            # Progressive delay with exponential backoff for connection errors
-            if attempt == 0:
-                delay = 2  # First attempt: 2 seconds
-            else:
-                delay = min(30, 2 ** (attempt + 1))  # Exponential backoff: 4, 8, 16, 30, 30...
-            
-            if debug:
-                print(f"Waiting {delay} seconds before request...")
-            time.sleep(delay)
+            # Connection errors cut the host's rate, so retries back off on their own
+            rate_controller.wait(url, debug=debug)
             
             # Create a fresh session for each attempt to avoid connection pooling issues
             if attempt > 0:
@@ -2879,6 +4196,7 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
                 session.close()  # Close old session
                 session = requests.Session()
                 session.cookies = NoDuplicatesCookieJar()
+                mount_transport(session)
                 for name, value in old_cookies.items():
                     session.cookies.set(name, value)
             
@@ -2900,13 +4218,21 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
             if debug:
                 print(f"Using timeout: {timeout} seconds")
             
+            request_start = time.time()
             response = session.get(url, headers=connection_headers, timeout=timeout)
+            latency = time.time() - request_start
             
             if debug:
                 print(f"Response Status: {response.status_code}")
             
-            # If we get a successful response, return it
-            if response.status_code == 200:
+            # Classify before recording, so a challenge page counts once, as throttled
+            challenge = (response.status_code not in (200, 202, 304)
+                         and not handle_waf_response(response, session, debug))
+            rate_controller.record(url, response.status_code, latency, throttled=True if challenge else None,
+                                   retry_after=_retry_after_seconds(response))
+            
+            # If we get a successful response, return it (304: the cached copy is still current)
+            if response.status_code in (200, 304):
                 if debug:
                     print("✅ Connection retry successful!")
                 return response
@@ -2920,8 +4246,10 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
                     return follow_up_response
             
             # For other status codes, check if we should retry
-            should_retry = handle_waf_response(response, session, debug)
-            if not should_retry:
+            if response.status_code == 202:
+                challenge = not handle_waf_response(response, session, debug)
+            if challenge:
+                response.waf_challenge = True
                 return response
             
         except (requests.exceptions.ConnectionError, 
@@ -2931,6 +4259,7 @@ def make_request_with_connection_retry(session, url: str, headers: dict, max_ret
                 ProtocolError,
                 MaxRetryError) as e:
             
+            rate_controller.record(url, error=True)
             error_str = str(e).lower()
             is_connection_error = any(err.lower() in error_str for err in connection_errors)
             
@@ -3018,8 +4347,9 @@ def fetch_with_robust_connection(url: str, main_id: str = None, main_class: str
                 print(f"❌ Robust connection request failed: {response.status_code}")
             return None
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Decode once and parse only the target main element(s) unless debugging the page structure
+        html = response_html(response)
+        soup = parse_html(html, 'main', main_id, main_class, full=debug)
         
         def process_main_content(main_element):
             """Helper function to process main content consistently"""